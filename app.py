@@ -1,31 +1,109 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, send_file, Response
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, send_file, send_from_directory, Response
 import os
+import sys
+import shutil
 import json
+import signal
+import atexit
 from functools import wraps
-from record_keeper import RecordKeeper, AuthManager, DocumentRecord
+from types import MappingProxyType
+from pathlib import Path
+from record_keeper import RecordKeeper, AuthManager, DocumentRecord, _write_json
 from werkzeug.utils import secure_filename
+from werkzeug.http import parse_options_header
+from werkzeug.wsgi import ClosingIterator
+from werkzeug.exceptions import RequestEntityTooLarge
 import time
 import threading
-from datetime import datetime
+from datetime import datetime, timedelta
 import uuid
 import queue
-from io import BytesIO
+import zlib
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO, StringIO
+import csv
 from PIL import Image, ImageDraw, ImageFont
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+try:
+    from flask_session import Session
+    from cachelib.file import FileSystemCache
+    FLASK_SESSION_AVAILABLE = True
+except ImportError:
+    FLASK_SESSION_AVAILABLE = False
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'your_secret_key_change_this_in_production')
 
+# Keep session data server-side when Flask-Session is installed so the cookie only carries an id
+if FLASK_SESSION_AVAILABLE:
+    # Session files live next to app.py, wherever the server is started from
+    app.config['SESSION_TYPE'] = 'cachelib'
+    app.config['SESSION_CACHELIB'] = FileSystemCache(os.path.join(app.root_path, 'flask_session'),
+                                                     threshold=500)
+    app.config['SESSION_PERMANENT'] = False
+    app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=8)
+    Session(app)
+
 # Ensure upload folder exists
 UPLOAD_FOLDER = 'uploads'
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Resolved once so handlers don't rebuild these paths per request
+UPLOAD_DIR = os.path.abspath(UPLOAD_FOLDER)
+LOGOS_DIR = os.path.join(UPLOAD_DIR, 'logos')
+os.makedirs(LOGOS_DIR, exist_ok=True)
+# Browser cache lifetime for /uploads; short-ish because logos are re-uploaded under the same name
+UPLOAD_MAX_AGE = 3600
+# Behind a server that honours X-Sendfile (e.g. Apache mod_xsendfile), let it send file bodies
+app.use_x_sendfile = os.environ.get('USE_X_SENDFILE') == '1'
 
-keeper = RecordKeeper()
+# Coalesce record saves so bursts of edits don't rewrite the JSON file every request;
+# RECORDS_FILE=records.parquet switches large installs to the Parquet store
+keeper = RecordKeeper(os.environ.get('RECORDS_FILE', 'records.json'), write_delay=0.5)
 auth_manager = AuthManager()
 
 # Real-time updates
-connected_clients = set()
-update_queue = queue.Queue()
+# Each SSE client gets its own deque of pending updates; update_condition guards them all
+connected_clients = {}
+update_condition = threading.Condition()
+# Per-client backlog limit; a client that falls further behind loses its oldest updates
+SSE_CLIENT_BACKLOG = 256
+SSE_HEARTBEAT_INTERVAL = 15  # seconds
+# Set at interpreter exit so open /events streams end promptly
+shutdown_event = threading.Event()
+# Serialized messages waiting for the dispatcher thread to fan them out
+dispatch_queue = queue.Queue()
+
+# JSON helpers - use orjson when installed, stdlib json otherwise
+def _json_loads(data):
+    """Parse JSON from bytes or str."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _json_dumps(data):
+    """Serialize data to indented UTF-8 JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+def _json_dumps_compact(data):
+    """Serialize data to compact UTF-8 JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
 
 # Helper function to broadcast updates to all clients
 def broadcast_update(update_type, data):
@@ -36,20 +114,62 @@ def broadcast_update(update_type, data):
             "data": data,
             "timestamp": datetime.now().isoformat()
         }
-        update_queue.put(update)
+        # Serialize once here (orjson when available); the dispatcher thread does the per-client fanout
+        dispatch_queue.put(b"data: " + _json_dumps_compact(update) + b"\n\n")
+
+def _dispatch_updates():
+    """Background loop handing queued SSE messages to every connected client."""
+    while True:
+        message = dispatch_queue.get()
+        with update_condition:
+            for pending in connected_clients.values():
+                pending.append(message)
+            update_condition.notify_all()
+
+threading.Thread(target=_dispatch_updates, name='sse-dispatch', daemon=True).start()
+
+def _shutdown_streams():
+    """Wake every SSE stream so it can finish instead of waiting out its heartbeat timeout."""
+    shutdown_event.set()
+    with update_condition:
+        update_condition.notify_all()
+
+atexit.register(_shutdown_streams)
 
 # System Settings Management
 class SystemSettings:
     def __init__(self, settings_file='system_settings.json'):
         self.settings_file = settings_file
         self.settings = self.load_settings()
+        self._rebuild_index()
+    
+    def _rebuild_index(self):
+        """Flatten settings into a dotted-key lookup table (e.g. 'theme.primary_color')."""
+        flat = {}
+        
+        def walk(prefix, node):
+            for key, value in node.items():
+                path = f'{prefix}{key}'
+                flat[path] = value
+                if isinstance(value, dict):
+                    walk(f'{path}.', value)
+        
+        walk('', self.settings)
+        self._flat = flat
+        # Read-only view for templates, plus the context dict handed to every render
+        self.flat = MappingProxyType(flat)
+        self.template_context = {
+            'system_settings': self.settings,
+            'settings_flat': self.flat,
+            'get_setting': self.get_setting
+        }
     
     def load_settings(self):
         """Load system settings from JSON file."""
         if os.path.exists(self.settings_file):
             try:
-                with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(self.settings_file, 'rb') as f:
+                    return _json_loads(f.read())
             except Exception as e:
                 print(f"Error loading settings: {e}")
         
@@ -94,8 +214,7 @@ class SystemSettings:
     def save_settings(self):
         """Save settings to JSON file."""
         try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=2, ensure_ascii=False)
+            _write_json(self.settings_file, self.settings, pretty=True)
             return True
         except Exception as e:
             print(f"Error saving settings: {e}")
@@ -103,6 +222,17 @@ class SystemSettings:
     
     def update_setting(self, key_path, value):
         """Update a specific setting using dot notation (e.g., 'theme.primary_color')."""
+        self._set_path(key_path, value)
+        self._rebuild_index()
+    
+    def update_many(self, updates):
+        """Update several dotted-key settings at once, rebuilding the lookup index only once."""
+        for key_path, value in updates.items():
+            self._set_path(key_path, value)
+        self._rebuild_index()
+    
+    def _set_path(self, key_path, value):
+        """Set a value in the settings tree without touching the index."""
         keys = key_path.split('.')
         current = self.settings
         
@@ -117,25 +247,14 @@ class SystemSettings:
     
     def get_setting(self, key_path, default=None):
         """Get a specific setting using dot notation."""
-        keys = key_path.split('.')
-        current = self.settings
-        
-        try:
-            for key in keys:
-                current = current[key]
-            return current
-        except (KeyError, TypeError):
-            return default
+        return self._flat.get(key_path, default)
 
 system_settings = SystemSettings()
 
 # Context processor to make system settings available in all templates
 @app.context_processor
 def inject_system_settings():
-    return {
-        'system_settings': system_settings.settings,
-        'get_setting': system_settings.get_setting
-    }
+    return system_settings.template_context
 
 # Authentication decorator
 def login_required(f):
@@ -229,11 +348,7 @@ def add_record():
 @login_required
 def edit_record(record_id):
     # Find the record
-    record = None
-    for r in keeper.get_all_records():
-        if r.id == record_id:
-            record = r
-            break
+    record = keeper.get_record(record_id)
     
     if not record:
         flash('Record not found.', 'warning')
@@ -260,7 +375,7 @@ def edit_record(record_id):
                 return redirect(url_for('edit_record', record_id=record_id))
             
             # Update the record
-            success = keeper.edit_record(
+            updated_record = keeper.edit_record(
                 record_id,
                 sender=sender,
                 subject=subject,
@@ -269,17 +384,9 @@ def edit_record(record_id):
                 status=status if status else record.status
             )
             
-            if success:
-                # Get the updated record for broadcasting
-                updated_record = None
-                for rec in keeper.get_all_records():
-                    if rec.id == record_id:
-                        updated_record = rec.to_dict()
-                        break
-                
+            if updated_record:
                 # Broadcast the update to all connected clients
-                if updated_record:
-                    broadcast_update("record_updated", updated_record)
+                broadcast_update("record_updated", updated_record.to_dict())
                 
                 flash('Record updated successfully!', 'success')
                 return redirect(url_for('records_page'))
@@ -294,17 +401,10 @@ def edit_record(record_id):
 @app.route('/mark_done/<record_id>')
 @login_required
 def mark_record_done(record_id):
-    if keeper.mark_as_done(record_id):
-        # Get the updated record for broadcasting
-        updated_record = None
-        for rec in keeper.get_all_records():
-            if rec.id == record_id:
-                updated_record = rec.to_dict()
-                break
-        
+    updated_record = keeper.mark_as_done(record_id)
+    if updated_record:
         # Broadcast the status update to all connected clients
-        if updated_record:
-            broadcast_update("record_updated", updated_record)
+        broadcast_update("record_updated", updated_record.to_dict())
         
         flash('Record marked as done successfully!', 'success')
     else:
@@ -323,6 +423,32 @@ def delete_record(record_id):
         flash('Record not found.', 'warning')
     return redirect(url_for('records_page'))
 
+def _bulk_mark_completed(record_ids):
+    """Mark records completed; returns (affected ids, flash message)."""
+    affected_ids = [record.id for record in keeper.mark_many_done(record_ids)]
+    return affected_ids, f'{len(affected_ids)} of {len(record_ids)} records marked as completed.'
+
+def _bulk_mark_pending(record_ids):
+    """Mark records pending; returns (affected ids, flash message)."""
+    affected_ids = [record.id for record in keeper.edit_many(record_ids, status='Pending')]
+    return affected_ids, f'{len(affected_ids)} of {len(record_ids)} records marked as pending.'
+
+def _bulk_delete(record_ids):
+    """Delete records; returns (affected ids, flash message)."""
+    affected_ids = keeper.delete_many(record_ids)
+    message = f'{len(affected_ids)} of {len(record_ids)} records deleted.'
+    # Check if all records were deleted and add appropriate message
+    if affected_ids and not keeper.get_all_records():
+        message = f'{len(affected_ids)} of {len(record_ids)} records deleted. Record numbering reset to start from 001 for next record.'
+    return affected_ids, message
+
+# action -> (handler, admin only)
+BULK_ACTIONS = {
+    'mark_completed': (_bulk_mark_completed, False),
+    'mark_pending': (_bulk_mark_pending, False),
+    'delete': (_bulk_delete, True),
+}
+
 @app.route('/bulk_action', methods=['POST'])
 @login_required
 def bulk_action():
@@ -335,76 +461,129 @@ def bulk_action():
             flash('No records selected.', 'warning')
             return redirect(url_for('records_page'))
         
-        success_count = 0
         total_count = len(record_ids)
-        updated_records = []  # Track updated records for broadcasting
-        
-        if action == 'mark_completed':
-            for record_id in record_ids:
-                if keeper.mark_as_done(record_id):
-                    success_count += 1
-                    # Get the updated record for broadcasting
-                    for rec in keeper.get_all_records():
-                        if rec.id == record_id:
-                            updated_records.append(rec.to_dict())
-                            break
-            flash(f'{success_count} of {total_count} records marked as completed.', 'success')
-            
-        elif action == 'mark_pending':
-            for record_id in record_ids:
-                success = keeper.edit_record(
-                    record_id,
-                    status='Pending'
-                )
-                if success:
-                    success_count += 1
-                    # Get the updated record for broadcasting
-                    for rec in keeper.get_all_records():
-                        if rec.id == record_id:
-                            updated_records.append(rec.to_dict())
-                            break
-            flash(f'{success_count} of {total_count} records marked as pending.', 'success')
-            
-        elif action == 'delete' and session.get('role') == 'admin':
-            deleted_ids = []
-            for record_id in record_ids:
-                if keeper.delete_record(record_id):
-                    success_count += 1
-                    deleted_ids.append(record_id)
-            
-            # Broadcast deletions
-            for record_id in deleted_ids:
-                broadcast_update("record_deleted", {"id": record_id})
-            
-            # Check if all records were deleted and add appropriate message
-            remaining_records = keeper.get_all_records()
-            if len(remaining_records) == 0 and success_count > 0:
-                flash(f'{success_count} of {total_count} records deleted. Record numbering reset to start from 001 for next record.', 'success')
-            else:
-                flash(f'{success_count} of {total_count} records deleted.', 'success')
-            
-        else:
-            flash('Invalid action or insufficient permissions.', 'danger')
+        affected_ids = []  # Track affected records for broadcasting
         
-        # Broadcast all record updates for mark completed/pending actions
-        for updated_record in updated_records:
-            broadcast_update("record_updated", updated_record)
+        handler, admin_only = BULK_ACTIONS.get(action, (None, False))
+        if handler is None or (admin_only and session.get('role') != 'admin'):
+            flash('Invalid action or insufficient permissions.', 'danger')
+        else:
+            affected_ids, message = handler(record_ids)
+            flash(message, 'success')
         
-        # If we have updates, also send a bulk update notification
-        if updated_records:
-            bulk_update_data = {
+        # Send a single bulk update notification instead of one per record
+        if affected_ids:
+            broadcast_update("bulk_update", {
                 "action": action,
-                "count": success_count,
+                "count": len(affected_ids),
                 "total": total_count,
-                "updated_records": updated_records
-            }
-            broadcast_update("bulk_update", bulk_update_data)
+                "record_ids": affected_ids
+            })
             
     except Exception as e:
         flash(f'Error performing bulk action: {e}', 'danger')
     
     return redirect(url_for('records_page'))
 
+EXPORT_MIMETYPES = {
+    'excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': ('csv', 'text/csv'),
+    'json': ('json', 'application/json'),
+}
+
+# Background export jobs: token -> (start time, Future resolving to (filepath, download_name, mimetype))
+export_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='export')
+export_jobs = {}
+export_jobs_lock = threading.Lock()
+# Jobs not collected within this many seconds are dropped and their files deleted
+EXPORT_JOB_TTL = 3600
+
+def _remove_export_file(filename):
+    """Delete an export file, ignoring one that is already gone."""
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
+
+def _discard_export_job(future):
+    """Delete a finished job's file; used as a done callback, so it also covers jobs still running."""
+    if not future.cancelled() and future.exception() is None:
+        _remove_export_file(future.result()[0])
+
+def _expire_export_jobs():
+    """Drop jobs older than EXPORT_JOB_TTL along with their export files."""
+    cutoff = time.monotonic() - EXPORT_JOB_TTL
+    with export_jobs_lock:
+        expired = [token for token, (started, _) in export_jobs.items() if started < cutoff]
+        futures = [export_jobs.pop(token)[1] for token in expired]
+    for future in futures:
+        future.add_done_callback(_discard_export_job)
+
+def _send_export_file(filename, download_name, mimetype):
+    """Send an export file as a download and delete it once the response is closed."""
+    # An open file rather than the path, so X-Sendfile can't hand a deleted path to the server
+    response = send_file(
+        open(filename, 'rb'),
+        as_attachment=True,
+        download_name=download_name,
+        mimetype=mimetype
+    )
+    # send_file returns a passthrough response, whose own close callbacks the WSGI
+    # server never runs; this wrapper closes the file first, then deletes it
+    response.response = ClosingIterator(response.response, lambda: _remove_export_file(filename))
+    return response
+
+CSV_EXPORT_FIELDS = ('id', 'date', 'sender', 'subject', 'destination', 'status')
+
+def _iter_csv_export(records):
+    """Yield CSV export chunks one row at a time."""
+    buffer = StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(CSV_EXPORT_FIELDS)
+    for record in records:
+        writer.writerow((record.id, record.date, record.sender, record.subject,
+                         record.destination, record.status))
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate(0)
+    # Header only when there are no records
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def _iter_json_export(records):
+    """Yield a JSON array export one record at a time."""
+    yield b'['
+    for index, record in enumerate(records):
+        if index:
+            yield b','
+        yield _json_dumps_compact(record.to_dict())
+    yield b']'
+
+STREAMED_EXPORTS = {
+    'csv': _iter_csv_export,
+    'json': _iter_json_export,
+}
+
+def _build_export_file(format_type, records, timestamp):
+    """Write an export of records to the upload folder and return (filepath, download_name, mimetype)."""
+    if format_type not in EXPORT_MIMETYPES:
+        raise ValueError(f'Unsupported export format: {format_type}')
+    
+    extension, mimetype = EXPORT_MIMETYPES[format_type]
+    download_name = f'records_export_{timestamp}.{extension}'
+    # Unique on disk, since each file is deleted once sent and two exports can share a timestamp
+    filename = os.path.join(UPLOAD_DIR, f'{uuid.uuid4().hex}_{download_name}')
+    
+    if format_type == 'excel':
+        if not keeper.export_to_excel(filename):
+            raise RuntimeError('Failed to export Excel file.')
+    else:
+        with open(filename, 'wb') as f:
+            for chunk in STREAMED_EXPORTS[format_type](records):
+                f.write(chunk)
+    
+    return filename, download_name, mimetype
+
 @app.route('/export')
 @app.route('/export/<format_type>')
 @login_required
@@ -415,60 +594,92 @@ def export_records(format_type='excel'):
             flash('No records available to export.', 'warning')
             return redirect(url_for('home'))
         
-        from datetime import datetime
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
-        if format_type == 'excel':
-            filename = os.path.join(app.config['UPLOAD_FOLDER'], f'records_export_{timestamp}.xlsx')
-            if keeper.export_to_excel(filename):
-                # Send file as download
-                return send_file(
-                    filename,
-                    as_attachment=True,
-                    download_name=f'records_export_{timestamp}.xlsx',
-                    mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-                )
-            else:
-                flash('Failed to export Excel file.', 'danger')
-                return redirect(url_for('home'))
-                
-        elif format_type == 'csv':
-            import pandas as pd
-            data = [record.to_dict() for record in records]
-            df = pd.DataFrame(data)
-            filename = os.path.join(app.config['UPLOAD_FOLDER'], f'records_export_{timestamp}.csv')
-            df.to_csv(filename, index=False, encoding='utf-8')
-            # Send file as download
-            return send_file(
-                filename,
-                as_attachment=True,
-                download_name=f'records_export_{timestamp}.csv',
-                mimetype='text/csv'
-            )
-            
-        elif format_type == 'json':
-            import json
-            data = [record.to_dict() for record in records]
-            filename = os.path.join(app.config['UPLOAD_FOLDER'], f'records_export_{timestamp}.json')
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            # Send file as download
-            return send_file(
-                filename,
-                as_attachment=True,
-                download_name=f'records_export_{timestamp}.json',
-                mimetype='application/json'
+        if format_type in STREAMED_EXPORTS:
+            # Stream CSV/JSON straight to the client without a temp file
+            extension, mimetype = EXPORT_MIMETYPES[format_type]
+            return Response(
+                STREAMED_EXPORTS[format_type](records),
+                mimetype=mimetype,
+                headers={'Content-Disposition': f'attachment; filename=records_export_{timestamp}.{extension}'}
             )
+        
+        filename, download_name, mimetype = _build_export_file(format_type, records, timestamp)
+        # Send file as download
+        return _send_export_file(filename, download_name, mimetype)
             
     except Exception as e:
         flash(f'Error exporting records: {e}', 'danger')
         return redirect(url_for('home'))
 
+@app.route('/export/start/<format_type>', methods=['POST'])
+@login_required
+def start_export(format_type):
+    """Start an export in the background and return a token to poll for the file."""
+    if format_type not in EXPORT_MIMETYPES:
+        return jsonify({'success': False, 'message': f'Unsupported export format: {format_type}'}), 400
+    
+    records = keeper.get_all_records()
+    if not records:
+        return jsonify({'success': False, 'message': 'No records available to export.'}), 400
+    
+    _expire_export_jobs()
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    token = uuid.uuid4().hex
+    future = export_executor.submit(_build_export_file, format_type, records, timestamp)
+    with export_jobs_lock:
+        export_jobs[token] = (time.monotonic(), future)
+    
+    return jsonify({
+        'success': True,
+        'token': token,
+        'status_url': url_for('export_status', token=token)
+    }), 202
+
+@app.route('/export/status/<token>')
+@login_required
+def export_status(token):
+    """Return the finished export file, or 202 while the job is still running."""
+    _expire_export_jobs()
+    with export_jobs_lock:
+        job = export_jobs.get(token)
+        # A finished job is handed out once, so its file can be deleted after sending
+        done = job is not None and job[1].done()
+        if done:
+            export_jobs.pop(token)
+    if job is None:
+        return jsonify({'success': False, 'message': 'Unknown export job.'}), 404
+    
+    if not done:
+        return jsonify({'success': True, 'status': 'pending'}), 202
+    
+    future = job[1]
+    try:
+        filename, download_name, mimetype = future.result()
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error exporting records: {e}'}), 500
+    
+    return _send_export_file(filename, download_name, mimetype)
+
+# records_version restarts at 0 with every process, so tag ETags with a per-process seed
+SEARCH_ETAG_SEED = uuid.uuid4().hex[:8]
+# Revalidate on every request: a 304 is cheap, and results change with any record edit
+SEARCH_CACHE_CONTROL = 'private, no-cache'
+
 @app.route('/search', methods=['GET'])
 @login_required
 def search_records():
     query = request.args.get('q', '').strip()
     
+    # Results only change when the records do, so let the browser revalidate cheaply
+    etag = f"{SEARCH_ETAG_SEED}-{keeper.records_version}-{zlib.crc32(query.encode('utf-8')):08x}"
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = SEARCH_CACHE_CONTROL
+        return response
+    
     if not query:
         # Return all records if no query
         records = keeper.get_all_records()
@@ -488,11 +699,14 @@ def search_records():
             'status': record.status
         })
     
-    return jsonify({
+    response = jsonify({
         'records': records_data,
         'count': len(records_data),
         'query': query
     })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = SEARCH_CACHE_CONTROL
+    return response
 
 @app.route('/upload', methods=['POST'])
 @login_required
@@ -505,14 +719,16 @@ def upload_file():
         flash('No selected file', 'danger')
         return redirect(url_for('home'))
     if file:
-        filename = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-        file.save(filename)
+        if not secure_filename(file.filename):
+            flash('Invalid file name', 'danger')
+            return redirect(url_for('home'))
         
         # Get import mode from form (append or replace)
         import_mode = request.form.get('import_mode', 'append')
         replace_existing = (import_mode == 'replace')
         
-        success = keeper.import_from_excel(filename, replace_existing)
+        # Parse the upload in memory instead of saving it to the uploads folder first
+        success = keeper.import_from_excel_stream(BytesIO(file.read()), replace_existing)
         if success:
             if replace_existing:
                 flash('Records replaced successfully!', 'success')
@@ -531,13 +747,13 @@ def export_backup():
             flash('No records available to backup.', 'warning')
             return redirect(url_for('home'))
         
-        from datetime import datetime
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        now = datetime.now()
+        timestamp = now.strftime('%Y%m%d_%H%M%S')
         
         # Create comprehensive backup with metadata
         backup_data = {
             'backup_info': {
-                'created_at': datetime.now().isoformat(),
+                'created_at': now.isoformat(),
                 'created_by': session.get('username', 'Unknown'),
                 'total_records': len(records),
                 'backup_version': '1.0'
@@ -547,10 +763,9 @@ def export_backup():
         }
         
         # Export as JSON backup file
-        import json
-        filename = os.path.join(app.config['UPLOAD_FOLDER'], f'backup_{timestamp}.json')
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(backup_data, f, indent=2, ensure_ascii=False)
+        filename = os.path.join(UPLOAD_DIR, f'backup_{timestamp}.json')
+        with open(filename, 'wb') as f:
+            f.write(_json_dumps(backup_data))
         
         # Send file as download
         return send_file(
@@ -582,7 +797,7 @@ def restore_backup():
             return redirect(url_for('home'))
         
         # Save uploaded file temporarily
-        filename = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(file.filename))
+        filename = os.path.join(UPLOAD_DIR, secure_filename(file.filename))
         file.save(filename)
         
         # Get restore mode from form (append or replace)
@@ -624,6 +839,58 @@ def restore_backup():
     
     return redirect(url_for('home'))
 
+MONTH_NAMES = ('', 'January', 'February', 'March', 'April', 'May', 'June', 'July',
+               'August', 'September', 'October', 'November', 'December')
+
+def _summarize_dates(records, since):
+    """Return (number of records dated on/after since, {'YYYY-MM': month summary})."""
+    if PANDAS_AVAILABLE and records:
+        return _summarize_dates_pandas(records, since)
+    
+    recent_count = 0
+    monthly_data = {}
+    for record in records:
+        date_obj = record.date_obj
+        if date_obj is None:
+            continue
+        if date_obj >= since:
+            recent_count += 1
+        month_key = f"{date_obj.year}-{date_obj.month:02d}"
+        month = monthly_data.get(month_key)
+        if month is None:
+            month = monthly_data[month_key] = {
+                'name': f"{MONTH_NAMES[date_obj.month]} {date_obj.year}",
+                'count': 0, 'pending': 0, 'completed': 0
+            }
+        month['count'] += 1
+        if record.status == 'Pending':
+            month['pending'] += 1
+        else:
+            month['completed'] += 1
+    return recent_count, monthly_data
+
+def _summarize_dates_pandas(records, since):
+    """Vectorized _summarize_dates: parse all dates in one pandas call and group by month."""
+    frame = pd.DataFrame({
+        'date': [record.date for record in records],
+        'pending': [record.status == 'Pending' for record in records]
+    })
+    # Invalid dates and "No Date" become NaT and are dropped
+    dates = pd.to_datetime(frame['date'].str.split(' ', n=1).str[0], format='%Y-%m-%d', errors='coerce')
+    valid = dates.notna()
+    frame, dates = frame[valid], dates[valid]
+    
+    recent_count = int((dates >= since).sum())
+    grouped = frame.groupby([dates.dt.year, dates.dt.month])['pending'].agg(['size', 'sum'])
+    
+    monthly_data = {}
+    for (year, month), count, pending in zip(grouped.index, grouped['size'], grouped['sum']):
+        monthly_data[f"{year}-{month:02d}"] = {
+            'name': f"{MONTH_NAMES[month]} {year}",
+            'count': int(count), 'pending': int(pending), 'completed': int(count - pending)
+        }
+    return recent_count, monthly_data
+
 @app.route('/analytics')
 @login_required
 def analytics():
@@ -633,59 +900,29 @@ def analytics():
         statistics = keeper.get_statistics()
         user_role = session.get('role', 'user')
         
-        # Calculate additional analytics
-        from datetime import datetime, timedelta
-        import calendar
-        
-        # Recent activity (last 30 days)
+        # Recent activity (last 30 days) and monthly breakdown
         thirty_days_ago = datetime.now() - timedelta(days=30)
-        recent_records = []
-        for r in records:
-            if r.date and r.date != "No Date":
-                try:
-                    date_obj = datetime.strptime(r.date.split(' ')[0], '%Y-%m-%d')
-                    if date_obj >= thirty_days_ago:
-                        recent_records.append(r)
-                except ValueError:
-                    continue  # Skip records with invalid date format
-        
-        # Monthly breakdown
-        monthly_data = {}
+        recent_records_count, monthly_data = _summarize_dates(records, thirty_days_ago)
+        
+        sender_counts = Counter()
+        destination_counts = Counter()
         for record in records:
-            try:
-                if record.date and record.date != "No Date":
-                    date_obj = datetime.strptime(record.date.split(' ')[0], '%Y-%m-%d')
-                    month_key = f"{date_obj.year}-{date_obj.month:02d}"
-                    month_name = f"{calendar.month_name[date_obj.month]} {date_obj.year}"
-                    if month_key not in monthly_data:
-                        monthly_data[month_key] = {'name': month_name, 'count': 0, 'pending': 0, 'completed': 0}
-                    monthly_data[month_key]['count'] += 1
-                    if record.status == 'Pending':
-                        monthly_data[month_key]['pending'] += 1
-                    else:
-                        monthly_data[month_key]['completed'] += 1
-            except (ValueError, AttributeError):
-                continue  # Skip records with invalid date format
+            # Top senders and destinations
+            sender_counts[record.sender] += 1
+            if record.destination:
+                destination_counts[record.destination] += 1
         
         # Sort monthly data by date
         sorted_monthly = dict(sorted(monthly_data.items(), reverse=True))
         
-        # Top senders and destinations
-        sender_counts = {}
-        destination_counts = {}
-        for record in records:
-            sender_counts[record.sender] = sender_counts.get(record.sender, 0) + 1
-            if record.destination:
-                destination_counts[record.destination] = destination_counts.get(record.destination, 0) + 1
-        
-        top_senders = sorted(sender_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        top_destinations = sorted(destination_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        top_senders = sender_counts.most_common(10)
+        top_destinations = destination_counts.most_common(10)
         
         analytics_data = {
             'records': records,
             'statistics': statistics,
             'user_role': user_role,
-            'recent_records_count': len(recent_records),
+            'recent_records_count': recent_records_count,
             'monthly_data': list(sorted_monthly.values())[:12],  # Last 12 months
             'top_senders': top_senders,
             'top_destinations': top_destinations,
@@ -727,8 +964,8 @@ def generate_report():
         user_role = session.get('role', 'user')
         username = session.get('username', 'Unknown')
         
-        from datetime import datetime
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        now = datetime.now()
+        timestamp = now.strftime('%Y%m%d_%H%M%S')
         
         # Generate comprehensive report data
         report_data = {
@@ -737,7 +974,7 @@ def generate_report():
             'user_role': user_role,
             'username': username,
             'timestamp': timestamp,
-            'generated_at': datetime.now().strftime('%B %d, %Y at %I:%M %p'),
+            'generated_at': now.strftime('%B %d, %Y at %I:%M %p'),
             'total_records': len(records)
         }
         
@@ -800,32 +1037,29 @@ def change_user_password():
 def update_settings():
     """Update system settings."""
     try:
+        # Collect every change and apply them together
+        updates = {}
+        
         # Handle logo upload first if present
         if 'logo' in request.files and request.files['logo'].filename != '':
             file = request.files['logo']
             
             # Check file extension
-            allowed_extensions = {'png', 'jpg', 'jpeg', 'gif', 'svg', 'webp'}
-            if '.' in file.filename and file.filename.rsplit('.', 1)[1].lower() in allowed_extensions:
-                # Create logos directory if it doesn't exist
-                logos_dir = os.path.join(app.config['UPLOAD_FOLDER'], 'logos')
-                os.makedirs(logos_dir, exist_ok=True)
-                
+            if _allowed_logo(file.filename):
                 # Save file with secure filename
                 filename = secure_filename(file.filename)
-                filepath = os.path.join(logos_dir, filename)
-                file.save(filepath)
+                filepath = os.path.join(LOGOS_DIR, filename)
+                _save_stream(file.stream, filepath)
                 
                 # Update logo URL in settings
-                logo_url = f'/uploads/logos/{filename}'
-                system_settings.update_setting('logo_url', logo_url)
+                updates['logo_url'] = f'/uploads/logos/{filename}'
                 flash('Logo uploaded successfully!', 'success')
             else:
                 flash('Invalid file type. Please upload PNG, JPG, JPEG, GIF, SVG, or WebP files only.', 'warning')
         
         # Update basic settings
         if 'system_name' in request.form:
-            system_settings.update_setting('system_name', request.form['system_name'])
+            updates['system_name'] = request.form['system_name']
         
         # Theme colors and typography are hardcoded for a professional appearance
         # No longer process theme field changes from the form
@@ -837,10 +1071,12 @@ def update_settings():
         
         for field in branding_fields:
             if field in request.form:
-                system_settings.update_setting(f'branding.{field}', request.form[field])
+                updates[f'branding.{field}'] = request.form[field]
         
         # Handle checkboxes
-        system_settings.update_setting('branding.show_logo', 'show_logo' in request.form)
+        updates['branding.show_logo'] = 'show_logo' in request.form
+        
+        system_settings.update_many(updates)
         
         # Save settings
         if system_settings.save_settings():
@@ -859,9 +1095,9 @@ def update_record_ids():
     """Update existing record IDs from old format to new format."""
     try:
         # Check if there are any records with old format
-        old_format_records = [r for r in keeper.get_all_records() if r.id.startswith("LGU_TNGLN-MAYOR'S OFFICE - ")]
+        plan = keeper.plan_id_format_update()
         
-        if not old_format_records:
+        if not plan:
             return jsonify({
                 'success': True, 
                 'message': 'All records already use the new ID format. No updates needed.',
@@ -869,38 +1105,33 @@ def update_record_ids():
             })
         
         # Record time and sample updates for response
-        import time
         start_time = time.time()
         
         # Create sample updates for feedback
-        sample_updates = []
-        for record in old_format_records[:5]:  # First 5 records
-            old_id_parts = record.id.split(" - ")
-            if len(old_id_parts) >= 2:
-                number_part = old_id_parts[-1]
-                new_id = f"MAYOR'S OFFICE - {number_part}"
-                sample_updates.append({
-                    'old_id': record.id,
-                    'new_id': new_id
-                })
+        sample_updates = [
+            {'old_id': record.id, 'new_id': new_id}
+            for record, new_id in plan[:5]  # First 5 records
+        ]
         
         # Update the record IDs
-        if keeper.update_existing_ids_to_new_format():
+        if keeper.update_existing_ids_to_new_format(plan):
             end_time = time.time()
             time_taken = round(end_time - start_time, 2)
             
+            updated_count = len(plan)
+            
             # Broadcast update to all connected clients
             broadcast_update("bulk_update", {
                 "action": "id_format_update",
-                "count": len(old_format_records),
-                "total": len(old_format_records),
-                "message": f"Updated {len(old_format_records)} record IDs to new format"
+                "count": updated_count,
+                "total": updated_count,
+                "message": f"Updated {updated_count} record IDs to new format"
             })
             
             return jsonify({
                 'success': True, 
-                'message': f'Successfully updated {len(old_format_records)} record ID(s) to new format.',
-                'updated_count': len(old_format_records),
+                'message': f'Successfully updated {updated_count} record ID(s) to new format.',
+                'updated_count': updated_count,
                 'time_taken': time_taken,
                 'sample_updates': sample_updates
             })
@@ -921,29 +1152,23 @@ def update_record_ids():
 def get_id_update_info():
     """Get information about records that need ID format update."""
     try:
-        all_records = keeper.get_all_records()
-        old_format_records = [r for r in all_records if r.id.startswith("LGU_TNGLN-MAYOR'S OFFICE - ")]
+        total_records = len(keeper.get_all_records())
+        plan = keeper.plan_id_format_update()
+        old_format_count = len(plan)
         
         # Get preview of records to be updated (up to 10)
-        preview_records = []
-        for record in old_format_records[:10]:
-            old_id_parts = record.id.split(" - ")
-            if len(old_id_parts) >= 2:
-                number_part = old_id_parts[-1]
-                new_id = f"MAYOR'S OFFICE - {number_part}"
-                preview_records.append({
-                    'old_id': record.id,
-                    'new_id': new_id,
-                    'subject': record.subject
-                })
+        preview_records = [
+            {'old_id': record.id, 'new_id': new_id, 'subject': record.subject}
+            for record, new_id in plan[:10]
+        ]
         
         return jsonify({
             'success': True,
-            'total_records': len(all_records),
-            'old_format_count': len(old_format_records),
-            'new_format_count': len(all_records) - len(old_format_records),
+            'total_records': total_records,
+            'old_format_count': old_format_count,
+            'new_format_count': total_records - old_format_count,
             'preview': preview_records,
-            'has_more': len(old_format_records) > 10
+            'has_more': old_format_count > 10
         })
         
     except Exception as e:
@@ -968,6 +1193,44 @@ def reset_data():
         flash(f'Error resetting data: {e}', 'danger')
     return redirect(url_for('admin_settings'))
 
+LOGO_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif', 'svg', 'webp'})
+# Logo URLs are served from the uploads folder under this prefix
+LOGO_URL_PREFIX = '/uploads/'
+
+def _allowed_logo(filename):
+    """Check that a logo file name has an allowed image extension."""
+    dot = filename.rfind('.')
+    return dot >= 0 and filename[dot + 1:].lower() in LOGO_EXTENSIONS
+
+UPLOAD_COPY_BUFFER = 1024 * 1024
+# Largest logo accepted as a raw request body
+MAX_LOGO_BYTES = 10 * 1024 * 1024
+
+def _save_stream(stream, filepath, max_bytes=None):
+    """Copy an upload stream to filepath in 1 MiB chunks.
+    
+    With max_bytes, raises RequestEntityTooLarge as soon as the stream goes past it.
+    """
+    with open(filepath, 'wb') as f:
+        if max_bytes is None:
+            shutil.copyfileobj(stream, f, length=UPLOAD_COPY_BUFFER)
+        else:
+            written = 0
+            while True:
+                chunk = stream.read(UPLOAD_COPY_BUFFER)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    raise RequestEntityTooLarge()
+                f.write(chunk)
+        f.flush()
+        # Hint that the written bytes needn't stay in the page cache (Linux only); dirty
+        # pages aren't dropped, so write them out first
+        if hasattr(os, 'posix_fadvise'):
+            os.fsync(f.fileno())
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
 @app.route('/admin/upload_logo', methods=['POST'])
 @admin_required
 def upload_logo():
@@ -982,21 +1245,15 @@ def upload_logo():
         return redirect(url_for('admin_settings'))
     
     # Check file extension
-    allowed_extensions = {'png', 'jpg', 'jpeg', 'gif', 'svg', 'webp'}
-    if not ('.' in file.filename and 
-            file.filename.rsplit('.', 1)[1].lower() in allowed_extensions):
+    if not _allowed_logo(file.filename):
         flash('Invalid file type. Please upload PNG, JPG, JPEG, GIF, SVG, or WebP files only.', 'danger')
         return redirect(url_for('admin_settings'))
     
     try:
-        # Create logos directory if it doesn't exist
-        logos_dir = os.path.join(app.config['UPLOAD_FOLDER'], 'logos')
-        os.makedirs(logos_dir, exist_ok=True)
-        
         # Save file with secure filename
         filename = secure_filename(file.filename)
-        filepath = os.path.join(logos_dir, filename)
-        file.save(filepath)
+        filepath = os.path.join(LOGOS_DIR, filename)
+        _save_stream(file.stream, filepath)
         
         # Update logo URL in settings
         logo_url = f'/uploads/logos/{filename}'
@@ -1012,6 +1269,55 @@ def upload_logo():
     
     return redirect(url_for('admin_settings'))
 
+def _logo_too_large():
+    """JSON 413 response for a logo over MAX_LOGO_BYTES."""
+    return jsonify({'success': False, 'message': f'Logo is too large (limit {MAX_LOGO_BYTES // (1024 * 1024)} MB).'}), 413
+
+@app.route('/admin/upload_logo_stream', methods=['POST'])
+@admin_required
+def upload_logo_stream():
+    """Upload system logo sent as the raw request body, skipping multipart parsing.
+    
+    The file name comes from the X-Filename header or a Content-Disposition filename.
+    """
+    _, options = parse_options_header(request.headers.get('Content-Disposition', ''))
+    filename = secure_filename(request.headers.get('X-Filename') or options.get('filename', ''))
+    if not filename:
+        return jsonify({'success': False, 'message': 'No logo file name given.'}), 400
+    
+    if not _allowed_logo(filename):
+        return jsonify({'success': False, 'message': 'Invalid file type. Please upload PNG, JPG, JPEG, GIF, SVG, or WebP files only.'}), 400
+    
+    if request.content_length is not None and request.content_length > MAX_LOGO_BYTES:
+        return _logo_too_large()
+    
+    filepath = os.path.join(LOGOS_DIR, filename)
+    part_path = f'{filepath}.part'
+    try:
+        # Copy the body to disk in large chunks, then move it into place; a cut-off or
+        # oversized upload leaves no partial file behind
+        try:
+            _save_stream(request.stream, part_path, max_bytes=MAX_LOGO_BYTES)
+            os.replace(part_path, filepath)
+        except BaseException:
+            try:
+                os.remove(part_path)
+            except OSError:
+                pass
+            raise
+        
+        logo_url = f'/uploads/logos/{filename}'
+        system_settings.update_setting('logo_url', logo_url)
+        if not system_settings.save_settings():
+            return jsonify({'success': False, 'message': 'Logo uploaded but failed to save settings.', 'logo_url': logo_url}), 500
+        
+        return jsonify({'success': True, 'message': 'Logo uploaded successfully!', 'logo_url': logo_url})
+    
+    except RequestEntityTooLarge:
+        return _logo_too_large()
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'Error uploading logo: {e}'}), 500
+
 @app.route('/admin/remove_logo', methods=['POST'])
 @admin_required
 def remove_logo():
@@ -1021,11 +1327,8 @@ def remove_logo():
         current_logo = system_settings.get_setting('logo_url', '')
         
         # Remove logo file if it exists
-        if current_logo:
-            logo_path = current_logo.replace('/uploads/', '')
-            full_path = os.path.join(app.config['UPLOAD_FOLDER'], logo_path)
-            if os.path.exists(full_path):
-                os.remove(full_path)
+        if current_logo.startswith(LOGO_URL_PREFIX):
+            (Path(UPLOAD_DIR) / current_logo[len(LOGO_URL_PREFIX):]).unlink(missing_ok=True)
         
         # Update settings
         system_settings.update_setting('logo_url', '')
@@ -1045,26 +1348,33 @@ def remove_logo():
 def events():
     def event_stream():
         client_id = str(uuid.uuid4())
-        connected_clients.add(client_id)
+        pending = deque(maxlen=SSE_CLIENT_BACKLOG)
+        with update_condition:
+            connected_clients[client_id] = pending
         
         try:
             # Send initial connection confirmation
             yield f"data: {{\"type\": \"connected\", \"client_id\": \"{client_id}\"}}\n\n"
             
-            while True:
-                # Check for updates in the queue
-                if not update_queue.empty():
-                    try:
-                        update = update_queue.get_nowait()
-                        yield f"data: {json.dumps(update)}\n\n"
-                    except:
-                        pass
-                time.sleep(0.5)  # Check every 500ms for better responsiveness
-        except GeneratorExit:
-            # Client disconnected
-            connected_clients.discard(client_id)
+            while not shutdown_event.is_set():
+                # Sleep until broadcast_update hands this client something (or shutdown starts)
+                with update_condition:
+                    if not pending:
+                        update_condition.wait(timeout=SSE_HEARTBEAT_INTERVAL)
+                    messages = list(pending)
+                    pending.clear()
+                if shutdown_event.is_set():
+                    break
+                if not messages:
+                    # SSE comment line keeps proxies from closing an idle connection
+                    yield b": heartbeat\n\n"
+                    continue
+                # Everything that queued up while the client was busy goes out in one write
+                yield b"".join(messages)
         finally:
-            connected_clients.discard(client_id)
+            # Client disconnected
+            with update_condition:
+                connected_clients.pop(client_id, None)
     
     return Response(event_stream(), mimetype="text/event-stream")
 
@@ -1073,14 +1383,13 @@ def events():
 @app.route('/uploads/<path:filename>')
 def uploaded_file(filename):
     """Serve uploaded files."""
-    from flask import send_from_directory
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    return send_from_directory(app.config['UPLOAD_FOLDER'], filename,
+                               conditional=True, max_age=UPLOAD_MAX_AGE)
 
 # Test search page
 @app.route('/test_search.html')
 def test_search():
     """Serve the test search page."""
-    from flask import send_from_directory
     return send_from_directory('.', 'test_search.html')
 
 # Debug search endpoint
@@ -1089,32 +1398,25 @@ def test_search():
 def debug_search():
     """Debug search endpoint with detailed logging."""
     query = request.args.get('q', '').strip()
-    
-    print(f"[DEBUG] Search query received: '{query}'")
-    print(f"[DEBUG] Request args: {request.args}")
-    print(f"[DEBUG] Request method: {request.method}")
+    # Logged at DEBUG level, so this is a no-op unless the app runs in debug mode
+    log = app.logger.debug
     
     try:
+        all_records = keeper.get_all_records()
         if not query:
-            records = keeper.get_all_records()
-            print(f"[DEBUG] No query - returning all {len(records)} records")
+            records = all_records
         else:
             records = keeper.search_records(query)
-            print(f"[DEBUG] Search found {len(records)} records")
         
         # Convert records to dictionary format
-        records_data = []
-        for record in records:
-            record_dict = {
-                'id': record.id,
-                'date': record.date,
-                'sender': record.sender,
-                'subject': record.subject,
-                'destination': record.destination,
-                'status': record.status
-            }
-            records_data.append(record_dict)
-            print(f"[DEBUG] Record: {record_dict}")
+        records_data = [{
+            'id': record.id,
+            'date': record.date,
+            'sender': record.sender,
+            'subject': record.subject,
+            'destination': record.destination,
+            'status': record.status
+        } for record in records]
         
         response_data = {
             'success': True,
@@ -1122,17 +1424,17 @@ def debug_search():
             'count': len(records_data),
             'query': query,
             'debug': {
-                'total_records_in_system': len(keeper.get_all_records()),
+                'total_records_in_system': len(all_records),
                 'search_performed': bool(query),
                 'timestamp': datetime.now().isoformat()
             }
         }
         
-        print(f"[DEBUG] Returning response with {len(records_data)} records")
+        log("debug_search returned %d of %d records for %r", len(records_data), len(all_records), query)
         return jsonify(response_data)
         
     except Exception as e:
-        print(f"[DEBUG] Error in search: {str(e)}")
+        app.logger.error("debug_search failed for %r: %s", query, e)
         return jsonify({
             'success': False,
             'error': str(e),
@@ -1146,6 +1448,8 @@ def debug_search():
 if __name__ == '__main__':
     # This is only used for local development
     # In production, Gunicorn will serve the app
+    # Exit normally on SIGTERM so pending record saves are flushed by atexit
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     port = int(os.environ.get('PORT', 5000))
     debug_mode = os.environ.get('FLASK_ENV', 'development') != 'production'
     app.run(host='0.0.0.0', port=port, debug=debug_mode)
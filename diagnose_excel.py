@@ -4,9 +4,23 @@ Diagnostic tool to analyze Excel files and identify import issues
 """
 
 import pandas as pd
+import importlib.util
 import os
 import sys
 
+# Prefer the Rust calamine reader (pandas >= 2.2) when installed; otherwise
+# pandas' default openpyxl engine, which already opens workbooks read-only
+CALAMINE_AVAILABLE = importlib.util.find_spec('python_calamine') is not None
+PANDAS_HAS_CALAMINE = tuple(int(part) for part in pd.__version__.split('.')[:2]) >= (2, 2)
+EXCEL_ENGINE = 'calamine' if CALAMINE_AVAILABLE and PANDAS_HAS_CALAMINE else None
+
+# Columns the importer reads; anything else is skipped when loading the sheet
+IMPORT_COLUMNS = {'sender', 'subject', 'destination', 'to', 'date'}
+
+def blank_mask(column):
+    """Boolean Series marking null or whitespace-only cells"""
+    return column.isna() | (column.astype(str).str.strip() == '')
+
 def diagnose_excel_file(filename):
     """Diagnose Excel file for potential import issues"""
     
@@ -19,20 +33,25 @@ def diagnose_excel_file(filename):
         return False
     
     try:
-        # Read the Excel file
+        # Read the first rows of every column for the column list and preview, then
+        # all rows of only the columns the importer cares about, as strings
         print("📂 Reading Excel file...")
-        df = pd.read_excel(filename)
+        preview = pd.read_excel(filename, nrows=5, engine=EXCEL_ENGINE)
+        all_columns = list(preview.columns)
+        # Match names the way the importer does (lowercased and stripped)
+        scan_columns = [col for col in all_columns if str(col).lower().strip() in IMPORT_COLUMNS]
+        df = pd.read_excel(filename, usecols=scan_columns or None, dtype=str, engine=EXCEL_ENGINE)
         print(f"✅ File read successfully")
         
         # Basic info
         print(f"\n📊 File Information:")
         print(f"   - Rows: {len(df)}")
-        print(f"   - Columns: {len(df.columns)}")
+        print(f"   - Columns: {len(all_columns)}")
         print(f"   - File size: {os.path.getsize(filename)} bytes")
         
         # Column analysis
         print(f"\n📋 Column Analysis:")
-        print(f"   Found columns: {list(df.columns)}")
+        print(f"   Found columns: {all_columns}")
         
         # Check for required columns
         required_cols = ['sender', 'subject']
@@ -65,21 +84,21 @@ def diagnose_excel_file(filename):
         
         # Data preview
         print(f"\n📄 Data Preview (first 5 rows):")
-        print(df.head().to_string(index=True))
+        print(preview.to_string(index=True))
         
         # Data quality analysis
         print(f"\n🔍 Data Quality Analysis:")
         
         if 'sender' in df.columns:
-            empty_senders = df['sender'].isna().sum() + (df['sender'] == '').sum()
+            empty_senders = blank_mask(df['sender']).sum()
             print(f"   - Empty/null senders: {empty_senders}")
         
         if 'subject' in df.columns:
-            empty_subjects = df['subject'].isna().sum() + (df['subject'] == '').sum()
+            empty_subjects = blank_mask(df['subject']).sum()
             print(f"   - Empty/null subjects: {empty_subjects}")
         
         if destination_col:
-            empty_destinations = df[destination_col].isna().sum() + (df[destination_col] == '').sum()
+            empty_destinations = blank_mask(df[destination_col]).sum()
             print(f"   - Empty/null destinations: {empty_destinations}")
         
         if 'date' in df.columns:
@@ -88,13 +107,7 @@ def diagnose_excel_file(filename):
         
         # Identify potentially importable rows
         if not missing_required:
-            valid_rows = 0
-            for index, row in df.iterrows():
-                sender = str(row['sender']).strip() if pd.notna(row['sender']) else ""
-                subject = str(row['subject']).strip() if pd.notna(row['subject']) else ""
-                
-                if sender and subject:
-                    valid_rows += 1
+            valid_rows = int((~blank_mask(df['sender']) & ~blank_mask(df['subject'])).sum())
             
             print(f"   ✅ Potentially importable rows: {valid_rows} out of {len(df)}")
             
@@ -6,31 +6,205 @@ A simple system to track document records with date, sender, subject, and destin
 
 import json
 import os
+import sys
 import hashlib
+import hmac
+import secrets
+import atexit
+import mmap
+import threading
+import tempfile
+import importlib.util
+from functools import lru_cache
+from contextlib import contextmanager
+from itertools import repeat
+from collections import Counter
+from bisect import bisect_left, bisect_right
+from operator import itemgetter
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, Tuple, Iterator
 import re
+from html import escape
 try:
     import pandas as pd
     PANDAS_AVAILABLE = True
 except ImportError:
     PANDAS_AVAILABLE = False
 
+# A Parquet data file also needs one of pandas' Parquet engines; only checked, not imported
+PARQUET_ENGINE_AVAILABLE = any(importlib.util.find_spec(name) is not None
+                               for name in ('pyarrow', 'fastparquet'))
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import simdjson
+    SIMDJSON_AVAILABLE = True
+except ImportError:
+    SIMDJSON_AVAILABLE = False
+
+try:
+    from rustpy_xlsxwriter import FastExcel
+    FAST_EXCEL_AVAILABLE = True
+except ImportError:
+    FAST_EXCEL_AVAILABLE = False
+
+# The process umask, read once (os.umask can only be read by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# One lock per target path, so concurrent replaces of the same file happen one at a time
+_replace_locks: Dict[str, threading.Lock] = {}
+
+@contextmanager
+def _atomic_open(path, mode='wb', **kwargs):
+    """Open a temporary file next to path for writing; on success fsync it and atomically replace path.
+    
+    A crash or error mid-write leaves the previous file intact. Each call writes its own
+    uniquely named temporary file, so concurrent writers of the same path don't collide.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file owner-only; give it the permissions a plain open would
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        # Windows refuses to replace a file that another replace is moving at the same time
+        with _replace_locks.setdefault(os.path.join(directory, name), threading.Lock()):
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# Files above this size are memory-mapped for orjson instead of read into a bytes copy
+MMAP_READ_THRESHOLD = 1 << 20
+
+def _read_json(path):
+    """Load a JSON file (orjson when available)."""
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size <= MMAP_READ_THRESHOLD:
+                return orjson.loads(f.read())
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                # The view must be released before the map can close
+                with memoryview(mapped) as view:
+                    return orjson.loads(view)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _json_dumper(pretty=False):
+    """Return a function serializing one value to UTF-8 JSON bytes.
+    
+    Compact (no whitespace) by default; pretty=True indents by two spaces.
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return lambda item: orjson.dumps(item, option=option)
+    if pretty:
+        return lambda item: json.dumps(item, indent=2, ensure_ascii=False).encode('utf-8')
+    return lambda item: json.dumps(item, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _write_json(path, data, pretty=False):
+    """Atomically write data as UTF-8 JSON (orjson when available), indented if pretty."""
+    with _atomic_open(path) as f:
+        f.write(_json_dumper(pretty)(data))
+
+def _write_json_array(path, items, envelope=None, key=None, pretty=False):
+    """Write an iterable of JSON values as an array, one item at a time.
+    
+    With envelope/key the array is written as envelope's last member, key, i.e. the
+    same text as _write_json(path, {**envelope, key: list(items)}, pretty); otherwise
+    the same text as _write_json(path, list(items), pretty). Either way the whole
+    serialized list is never held in memory. The file is replaced atomically.
+    """
+    dump = _json_dumper(pretty)
+    
+    with _atomic_open(path) as f:
+        indent = b"\n  " if pretty else b""
+        if envelope is not None:
+            # Leading members, then open the array one level deeper
+            head = dump({**envelope, key: []})
+            f.write(head[:head.rindex(b"[]")])
+            if pretty:
+                indent = b"\n    "
+        separator = b"[" + indent
+        for item in items:
+            f.write(separator)
+            # Nest each item one level deeper than the array, as a whole-document dump would
+            text = dump(item)
+            f.write(text.replace(b"\n", indent) if pretty else text)
+            separator = b"," + indent
+        f.write(b"[]" if separator == b"[" + indent else indent[:-2] + b"]")
+        if envelope is not None:
+            f.write(b"\n}" if pretty else b"}")
+
+# Date patterns used while importing and normalizing dates, compiled once
+_DATE_PATTERNS = [
+    # US format with dots or slashes: MM.DD.YYYY or MM/DD/YYYY (your preferred format)
+    (re.compile(r'^(\d{1,2})[./](\d{1,2})[./](\d{4})$'), 'us_format'),
+    # US format with dashes: MM-DD-YYYY
+    (re.compile(r'^(\d{1,2})-(\d{1,2})-(\d{4})$'), '%m-%d-%Y'),
+    # ISO format: YYYY-MM-DD
+    (re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$'), '%Y-%m-%d'),
+    # ISO with time: YYYY-MM-DD HH:MM:SS
+    (re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})\s+(\d{1,2}):(\d{1,2}):(\d{1,2})$'), '%Y-%m-%d %H:%M:%S'),
+    # US format with time: MM.DD.YYYY HH:MM:SS or MM/DD/YYYY HH:MM:SS
+    (re.compile(r'^(\d{1,2})[./](\d{1,2})[./](\d{4})\s+(\d{1,2}):(\d{1,2}):(\d{1,2})$'), 'us_format_time'),
+]
+
+_READABLE_PATTERNS = [
+    re.compile(r'^[A-Za-z]+ \d{1,2}, \d{4}$'),  # "January 7, 2025"
+    re.compile(r'^[A-Za-z]+ \d{1,2}, \d{4} at \d{1,2}:\d{2} [AP]M$'),  # "January 7, 2025 at 2:30 PM"
+]
+
+_US_FORMAT_PATTERN = re.compile(r'^\d{1,2}[./]\d{1,2}[./]\d{4}(\s+\d{1,2}:\d{2}:\d{2})?$')
+_ISO_PATTERN = re.compile(r'^\d{4}-\d{1,2}-\d{1,2}(\s+\d{1,2}:\d{2}:\d{2})?$')
+
 class User:
     """Represents a user with authentication and role information."""
     
+    __slots__ = ('username', 'password_hash', 'role')
+    
     def __init__(self, username: str, password: str, role: str = "user"):
         self.username = username
         self.password_hash = self._hash_password(password)
         self.role = role  # "admin" or "user"
     
+    # scrypt cost parameters; stored hashes look like "scrypt$<salt hex>$<hash hex>"
+    SCRYPT_PARAMS = {'n': 2 ** 14, 'r': 8, 'p': 1}
+    
     def _hash_password(self, password: str) -> str:
-        """Hash password using SHA-256."""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash password with scrypt and a fresh random salt."""
+        salt = secrets.token_bytes(16)
+        digest = hashlib.scrypt(password.encode(), salt=salt, **self.SCRYPT_PARAMS)
+        return f"scrypt${salt.hex()}${digest.hex()}"
     
     def verify_password(self, password: str) -> bool:
-        """Verify password against stored hash."""
-        return self._hash_password(password) == self.password_hash
+        """Verify password against stored hash (constant-time comparison)."""
+        if self.password_hash.startswith("scrypt$"):
+            _, salt_hex, digest_hex = self.password_hash.split("$")
+            digest = hashlib.scrypt(password.encode(), salt=bytes.fromhex(salt_hex), **self.SCRYPT_PARAMS)
+            return hmac.compare_digest(digest.hex(), digest_hex)
+        # Unsalted SHA-256 hashes from older users.json files
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), self.password_hash)
+    
+    def needs_rehash(self) -> bool:
+        """Check if the stored hash uses the old unsalted SHA-256 format."""
+        return not self.password_hash.startswith("scrypt$")
     
     def to_dict(self) -> Dict:
         """Convert user to dictionary for JSON serialization."""
@@ -54,6 +228,8 @@ class AuthManager:
     
     def __init__(self, users_file: str = "users.json"):
         self.users_file = users_file
+        # Indent users.json for reading by hand; compact by default
+        self.pretty_json = False
         self.users: Dict[str, User] = {}
         self.current_user: Optional[User] = None
         self.load_users()
@@ -79,10 +255,9 @@ class AuthManager:
             return
         
         try:
-            with open(self.users_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.users = {username: User.from_dict(user_data) 
-                             for username, user_data in data.items()}
+            data = _read_json(self.users_file)
+            self.users = {username: User.from_dict(user_data) 
+                         for username, user_data in data.items()}
         except Exception as e:
             print(f"Error loading users: {e}")
             self.users = {}
@@ -90,10 +265,9 @@ class AuthManager:
     def save_users(self):
         """Save users to JSON file."""
         try:
-            with open(self.users_file, 'w', encoding='utf-8') as f:
-                user_data = {username: user.to_dict() 
-                           for username, user in self.users.items()}
-                json.dump(user_data, f, indent=2, ensure_ascii=False)
+            user_data = {username: user.to_dict() 
+                       for username, user in self.users.items()}
+            _write_json(self.users_file, user_data, self.pretty_json)
         except Exception as e:
             print(f"Error saving users: {e}")
     
@@ -103,6 +277,10 @@ class AuthManager:
             user = self.users[username]
             if user.verify_password(password):
                 self.current_user = user
+                # Upgrade legacy hashes now that the plaintext is at hand
+                if user.needs_rehash():
+                    user.password_hash = user._hash_password(password)
+                    self.save_users()
                 return True
         return False
     
@@ -175,6 +353,8 @@ class AuthManager:
 class DocumentRecord:
     """Represents a single document record."""
     _id_counter = None  # Store counter in file for persistence
+    # No per-instance __dict__; large record sets are mostly these objects
+    __slots__ = ('id', 'date', 'sender', 'subject', 'destination', 'status', '_date_cache', '_search_cache', '_dict_cache')
     
     def __init__(self, sender: str, subject: str, destination: str, date: Optional[str] = None, record_id: Optional[str] = None, auto_date: bool = True, status: str = "Pending"):
         self.id = record_id if record_id else self._generate_id()
@@ -199,16 +379,56 @@ class DocumentRecord:
         formatted_id = f"MAYOR'S OFFICE - {DocumentRecord._id_counter:03d}"
         return formatted_id
     
+    @property
+    def date_obj(self) -> Optional[datetime]:
+        """Date part of the record's date as a datetime, or None if missing/invalid.
+        
+        Parsed once and cached until the date string changes.
+        """
+        cached = getattr(self, '_date_cache', None)
+        if cached is None or cached[0] != self.date:
+            parsed = None
+            if self.date and self.date != "No Date":
+                try:
+                    parsed = datetime.strptime(self.date.split(' ')[0], '%Y-%m-%d')
+                except ValueError:
+                    pass
+            cached = (self.date, parsed)
+            self._date_cache = cached
+        return cached[1]
+    
+    @property
+    def search_text(self) -> str:
+        """Lowercased id/date/sender/subject/destination for substring search.
+        
+        Cached until one of those fields changes, so only edited records are re-lowered.
+        """
+        fields = (self.id, self.date, self.sender, self.subject, self.destination)
+        cached = getattr(self, '_search_cache', None)
+        if cached is None or cached[0] != fields:
+            # Fields are joined with a separator so a query can't match across two fields
+            cached = (fields, "\x00".join(fields).lower())
+            self._search_cache = cached
+        return cached[1]
+    
     def to_dict(self) -> Dict:
-        """Convert record to dictionary for JSON serialization."""
-        return {
-            'id': self.id,
-            'date': self.date,
-            'sender': self.sender,
-            'subject': self.subject,
-            'destination': self.destination,
-            'status': self.status
-        }
+        """Convert record to dictionary for JSON serialization.
+        
+        The dict is cached until a field changes and shared between callers, so don't modify it.
+        """
+        fields = (self.id, self.date, self.sender, self.subject, self.destination, self.status)
+        cached = getattr(self, '_dict_cache', None)
+        if cached is None or cached[0] != fields:
+            cached = (fields, {
+                'id': self.id,
+                'date': self.date,
+                'sender': self.sender,
+                'subject': self.subject,
+                'destination': self.destination,
+                'status': self.status
+            })
+            self._dict_cache = cached
+        return cached[1]
     
     @classmethod
     def from_dict(cls, data: Dict) -> 'DocumentRecord':
@@ -218,6 +438,22 @@ class DocumentRecord:
         record = cls(data['sender'], data['subject'], data['destination'], data['date'], data['id'], status=status)
         return record
     
+    @classmethod
+    def from_backup_dict(cls, data: Dict) -> 'DocumentRecord':
+        """Create a freshly numbered DocumentRecord from a backup entry, keeping its date.
+        
+        Same result as cls(sender, subject, destination, date, auto_date=False, status=status),
+        assigning the slots directly instead of going through __init__.
+        """
+        record = object.__new__(cls)
+        record.id = record._generate_id()
+        record.date = data.get('date') or "No Date"
+        record.sender = data.get('sender', '')
+        record.subject = data.get('subject', '')
+        record.destination = data.get('destination', '')
+        record.status = "Completed" if data.get('status') in ("Done", "Completed") else "Pending"
+        return record
+    
     def __str__(self) -> str:
         """String representation of the record."""
         status_indicator = "✅" if self.status == "Completed" else "⏳"
@@ -227,12 +463,98 @@ class RecordKeeper:
     """Main class for managing document records."""
     
     COUNTER_FILE = "counter.txt"
+    # Version stamped into the JSON data file; 2 = {"schema_version", "records"} with ISO dates
+    SCHEMA_VERSION = 2
+    # Column order of get_records_frame() and the Parquet data file, matching DocumentRecord.to_dict()
+    RECORD_COLUMNS = ('id', 'date', 'sender', 'subject', 'destination', 'status')
+    OLD_ID_PREFIX = "LGU_TNGLN-MAYOR'S OFFICE - "
+    NEW_ID_PREFIX = "MAYOR'S OFFICE - "
     
-    def __init__(self, data_file: str = "records.json"):
+    def __init__(self, data_file: str = "records.json", write_delay: float = 0.0):
         self.data_file = data_file
-        self.records: List[DocumentRecord] = []
-        self.load_records()
+        # Refuse a Parquet store that couldn't be written, rather than dropping every save
+        if self._uses_parquet() and not (PANDAS_AVAILABLE and PARQUET_ENGINE_AVAILABLE):
+            raise RuntimeError(f"{data_file} is a Parquet data file, which needs pandas and pyarrow "
+                               "(or fastparquet). Install with: pip install pandas pyarrow")
+        # When write_delay > 0, saves are coalesced and written that many seconds
+        # after the last change instead of on every mutation
+        self.write_delay = write_delay
+        # Indent the JSON data file for reading by hand; compact by default
+        self.pretty_json = False
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._save_lock = threading.Lock()
+        # Nesting depth of bulk() blocks; saves inside one are deferred to its end
+        self._bulk_depth = 0
+        self._bulk_pending = set()
+        # Incremented on every mutation so cached views know when to rebuild
+        self.records_version = 0
+        self._snapshot = None
+        self._search_index = None
+        self._date_index = None
+        self._frame = None
+        self._statistics = None
+        # Results are keyed on (query, records_version), so any mutation invalidates them
+        self._cached_search = lru_cache(maxsize=256)(self._search_uncached)
+        self._records: List[DocumentRecord] = []
+        self._by_id: Dict[str, DocumentRecord] = {}
+        # IDs held by more than one record (legacy data), so delete knows when to rescan
+        self._duplicate_ids: Set[str] = set()
+        # Reusable simdjson parser for restore_from_backup, created on first use
+        self._simdjson_parser = None
+        # Counter first, so the record scan only has to raise it (and save it) when records are ahead
         self._load_counter()
+        self.load_records()
+        if self.write_delay > 0:
+            atexit.register(self.flush)
+    
+    @property
+    def records(self) -> List[DocumentRecord]:
+        """The live list of records."""
+        return self._records
+    
+    @records.setter
+    def records(self, value: List[DocumentRecord]):
+        self._records = value
+        self._reindex()
+        self._touch()
+    
+    def _touch(self):
+        """Mark the records as changed so cached views are rebuilt on next access."""
+        self.records_version += 1
+    
+    def _reindex(self):
+        """Rebuild the id -> record index from the records list (first record wins on duplicates)."""
+        self._by_id = {record.id: record for record in reversed(self._records)}
+        self._duplicate_ids = set()
+        if len(self._by_id) != len(self._records):
+            seen = set()
+            for record in self._records:
+                if record.id in seen:
+                    self._duplicate_ids.add(record.id)
+                seen.add(record.id)
+    
+    def _append_record(self, record: DocumentRecord):
+        """Append a record to the list and the id index."""
+        self._records.append(record)
+        if self._by_id.setdefault(record.id, record) is not record:
+            self._duplicate_ids.add(record.id)
+    
+    def _get_records_cached(self) -> Tuple[DocumentRecord, ...]:
+        """Return a records snapshot, rebuilt only when records_version changes."""
+        if self._snapshot is None or self._snapshot[0] != self.records_version:
+            self._snapshot = (self.records_version, tuple(self._records))
+        return self._snapshot[1]
+    
+    def get_records_frame(self):
+        """Return the records as a column-per-field DataFrame (treat as read-only).
+        
+        Built once per records_version and shared, like get_all_records().
+        """
+        if self._frame is None or self._frame[0] != self.records_version:
+            columns = {name: [getattr(record, name) for record in self._records] for name in self.RECORD_COLUMNS}
+            self._frame = (self.records_version, pd.DataFrame(columns, columns=list(self.RECORD_COLUMNS)))
+        return self._frame[1]
     
     def _load_counter(self):
         """Load the ID counter from file."""
@@ -245,34 +567,60 @@ class RecordKeeper:
         else:
             DocumentRecord._id_counter = 0
 
+    @contextmanager
+    def bulk(self):
+        """Defer record and counter saves until the outermost bulk() block exits.
+        
+        Usage:
+            with keeper.bulk():
+                keeper.add_record(...)
+                keeper.edit_record(...)
+        """
+        self._bulk_depth += 1
+        try:
+            yield self
+        finally:
+            self._bulk_depth -= 1
+            if self._bulk_depth == 0:
+                pending, self._bulk_pending = self._bulk_pending, set()
+                if 'records' in pending:
+                    self.save_records()
+                if 'counter' in pending:
+                    self._save_counter()
+    
     def _save_counter(self):
         """Save the current ID counter to file."""
-        with open(self.COUNTER_FILE, 'w') as file:
+        if self._bulk_depth > 0:
+            self._bulk_pending.add('counter')
+            return
+        with _atomic_open(self.COUNTER_FILE, 'w') as file:
             file.write(str(DocumentRecord._id_counter))
     
-    def _parse_and_format_date(self, date_str: str) -> str:
+    @staticmethod
+    def _parse_and_format_date(date_str: str) -> str:
         """Parse various date formats and return a standardized date string."""
         if not date_str or str(date_str).strip().lower() in ['nan', 'nat', 'none', '']:
             return None
         
         date_str = str(date_str).strip()
-        
-        # Common date patterns to try
-        date_patterns = [
-            # US format with dots or slashes: MM.DD.YYYY or MM/DD/YYYY (your preferred format)
-            (r'^(\d{1,2})[./](\d{1,2})[./](\d{4})$', 'us_format'),
-            # US format with dashes: MM-DD-YYYY
-            (r'^(\d{1,2})-(\d{1,2})-(\d{4})$', '%m-%d-%Y'),
-            # ISO format: YYYY-MM-DD
-            (r'^(\d{4})-(\d{1,2})-(\d{1,2})$', '%Y-%m-%d'),
-            # ISO with time: YYYY-MM-DD HH:MM:SS
-            (r'^(\d{4})-(\d{1,2})-(\d{1,2})\s+(\d{1,2}):(\d{1,2}):(\d{1,2})$', '%Y-%m-%d %H:%M:%S'),
-            # US format with time: MM.DD.YYYY HH:MM:SS or MM/DD/YYYY HH:MM:SS
-            (r'^(\d{1,2})[./](\d{1,2})[./](\d{4})\s+(\d{1,2}):(\d{1,2}):(\d{1,2})$', 'us_format_time'),
-        ]
-        
-        for pattern, format_str in date_patterns:
-            match = re.match(pattern, date_str)
+
+        # Fast path for the common already-standard input; fromisoformat only validates
+        # the calendar date, so invalid dates still fall through to the patterns below
+        if len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-':
+            try:
+                datetime.fromisoformat(date_str)
+                return date_str
+            except ValueError:
+                pass
+        elif len(date_str) == 19 and date_str[4] == '-' and date_str[10] == ' ' and date_str[13] == ':':
+            try:
+                datetime.fromisoformat(date_str)
+                return date_str[:10] if date_str.endswith(' 00:00:00') else date_str
+            except ValueError:
+                pass
+
+        for pattern, format_str in _DATE_PATTERNS:
+            match = pattern.match(date_str)
             if match:
                 try:
                     # Handle US format: MM.DD.YYYY or MM/DD/YYYY (your preferred format)
@@ -316,142 +664,299 @@ class RecordKeeper:
     def add_record(self, sender: str, subject: str, destination: str, date: Optional[str] = None) -> DocumentRecord:
         """Add a new document record."""
         record = DocumentRecord(sender, subject, destination, date)
-        self.records.append(record)
+        self._append_record(record)
+        self._touch()
         self.save_records()
         self._save_counter()
         return record
     
-    def get_all_records(self) -> List[DocumentRecord]:
-        """Get all records."""
-        return self.records.copy()
+    def get_all_records(self) -> Tuple[DocumentRecord, ...]:
+        """Get all records as an immutable snapshot shared until the next mutation."""
+        return self._get_records_cached()
+    
+    def iter_records(self) -> Iterator[DocumentRecord]:
+        """Iterate the live records in order without taking a snapshot.
+        
+        For single-threaded read-only passes; don't add or remove records while iterating.
+        """
+        return iter(self._records)
+    
+    def get_record(self, record_id: str) -> Optional[DocumentRecord]:
+        """Get a single record by ID, or None if it does not exist."""
+        return self._by_id.get(record_id)
     
     def search_records(self, query: str) -> List[DocumentRecord]:
         """Search records by ID, date, sender, subject, or destination."""
         if not query:
             return self.records.copy()
         
-        query = query.lower()
-        matching_records = []
+        return list(self._cached_search(query.lower(), self.records_version))
+    
+    def _get_search_index(self) -> Tuple[Tuple[str, DocumentRecord], ...]:
+        """Return (lowercased searchable text, record) pairs, rebuilt only when records_version changes."""
+        if self._search_index is None or self._search_index[0] != self.records_version:
+            self._search_index = (self.records_version, tuple(
+                (record.search_text, record) for record in self._records
+            ))
+        return self._search_index[1]
+    
+    def _search_uncached(self, query: str, version: int) -> Tuple[DocumentRecord, ...]:
+        """Scan the search index for a lowercased query (version is only part of the cache key)."""
+        return tuple(record for blob, record in self._get_search_index() if query in blob)
+    
+    def get_records_by_date_range(self, start_date: str, end_date: str) -> List[DocumentRecord]:
+        """Get records within a date range (YYYY-MM-DD format), ordered by date."""
+        keys, records = self._get_date_index()
+        return list(records[bisect_left(keys, start_date):bisect_right(keys, end_date)])
+    
+    def _get_date_index(self) -> Tuple[List[str], Tuple[DocumentRecord, ...]]:
+        """Return (date keys, records) sorted by the date part, rebuilt only when records_version changes."""
+        if self._date_index is None or self._date_index[0] != self.records_version:
+            # Stable sort, so records on the same day keep their list order
+            pairs = sorted(((record.date.partition(' ')[0], record) for record in self._records),
+                           key=itemgetter(0))
+            self._date_index = (self.records_version,
+                                [key for key, _ in pairs], tuple(record for _, record in pairs))
+        return self._date_index[1], self._date_index[2]
+    
+    def delete_record(self, record_id: str) -> bool:
+        """Delete a record by ID."""
+        record = self._by_id.pop(record_id, None)
+        if record is None:
+            return False
+        
+        # Records compare by identity, so this only removes the indexed one
+        self._records.remove(record)
+        # Legacy data can hold duplicate IDs; only for a known one is the list scanned,
+        # letting the next record with it take over the index entry
+        if record_id in self._duplicate_ids:
+            others = [other for other in self._records if other.id == record_id]
+            self._by_id[record_id] = others[0]
+            if len(others) == 1:
+                self._duplicate_ids.discard(record_id)
+        self._touch()
+        self.save_records()
         
-        for record in self.records:
-            # Search in all fields: ID, date, sender, subject, destination
-            if (query in record.id.lower() or 
-                query in record.date.lower() or 
-                query in record.sender.lower() or 
-                query in record.subject.lower() or 
-                query in record.destination.lower()):
-                matching_records.append(record)
+        # Check if all records have been deleted and reset counter if so
+        if len(self.records) == 0:
+            DocumentRecord._id_counter = 0
+            self._save_counter()
+            print("All records deleted. Counter reset to start from 001 for next record.")
         
-        return matching_records
+        return True
     
-    def get_records_by_date_range(self, start_date: str, end_date: str) -> List[DocumentRecord]:
-        """Get records within a date range (YYYY-MM-DD format)."""
-        matching_records = []
+    def delete_many(self, record_ids: List[str]) -> List[str]:
+        """Delete several records by ID and save once. Returns the IDs that were deleted."""
+        deleted_ids = [record_id for record_id in dict.fromkeys(record_ids) if record_id in self._by_id]
+        if not deleted_ids:
+            return []
         
-        for record in self.records:
-            record_date = record.date.split(' ')[0]  # Extract date part
-            if start_date <= record_date <= end_date:
-                matching_records.append(record)
+        targets = set(deleted_ids)
+        self._records = [record for record in self._records if record.id not in targets]
+        self._reindex()
+        self._touch()
+        self.save_records()
+        
+        # Check if all records have been deleted and reset counter if so
+        if len(self.records) == 0:
+            DocumentRecord._id_counter = 0
+            self._save_counter()
+            print("All records deleted. Counter reset to start from 001 for next record.")
         
-        return matching_records
+        return deleted_ids
     
-    def delete_record(self, record_id: str) -> bool:
-        """Delete a record by ID."""
-        for i, record in enumerate(self.records):
-            if record.id == record_id:
-                del self.records[i]
-                self.save_records()
-                
-                # Check if all records have been deleted and reset counter if so
-                if len(self.records) == 0:
-                    DocumentRecord._id_counter = 0
-                    self._save_counter()
-                    print("All records deleted. Counter reset to start from 001 for next record.")
-                
-                return True
-        return False
+    def edit_record(self, record_id: str, **kwargs) -> Optional[DocumentRecord]:
+        """Edit a record by ID with provided field updates; returns the record, or None if not found."""
+        record = self._by_id.get(record_id)
+        if record is None:
+            return None
+        
+        self._apply_edits(record, kwargs)
+        self._touch()
+        self.save_records()
+        return record
     
-    def edit_record(self, record_id: str, **kwargs) -> bool:
-        """Edit a record by ID with provided field updates."""
-        for record in self.records:
-            if record.id == record_id:
-                # Update only provided fields
-                if 'sender' in kwargs:
-                    record.sender = kwargs['sender']
-                if 'subject' in kwargs:
-                    record.subject = kwargs['subject']
-                if 'destination' in kwargs:
-                    record.destination = kwargs['destination']
-                if 'date' in kwargs:
-                    record.date = kwargs['date']
-                if 'status' in kwargs:
-                    record.status = kwargs['status']
-                self.save_records()
-                return True
-        return False
+    def edit_many(self, record_ids: List[str], **kwargs) -> List[DocumentRecord]:
+        """Apply the same field updates to several records and save once."""
+        updated_records = []
+        for record_id in record_ids:
+            record = self._by_id.get(record_id)
+            if record is not None:
+                self._apply_edits(record, kwargs)
+                updated_records.append(record)
+        
+        if updated_records:
+            self._touch()
+            self.save_records()
+        return updated_records
     
-    def mark_as_completed(self, record_id: str) -> bool:
+    def _apply_edits(self, record: DocumentRecord, fields: Dict):
+        """Update only the provided fields of a record."""
+        if 'sender' in fields:
+            record.sender = fields['sender']
+        if 'subject' in fields:
+            record.subject = fields['subject']
+        if 'destination' in fields:
+            record.destination = fields['destination']
+        if 'date' in fields:
+            record.date = fields['date']
+        if 'status' in fields:
+            record.status = fields['status']
+    
+    def mark_as_completed(self, record_id: str) -> Optional[DocumentRecord]:
         """Mark a record as completed."""
         return self.edit_record(record_id, status="Completed")
     
-    def mark_as_pending(self, record_id: str) -> bool:
+    def mark_as_pending(self, record_id: str) -> Optional[DocumentRecord]:
         """Mark a record as pending."""
         return self.edit_record(record_id, status="Pending")
     
-    def mark_as_done(self, record_id: str) -> bool:
+    def mark_as_done(self, record_id: str) -> Optional[DocumentRecord]:
         """Mark a record as done (alias for completed)."""
         return self.mark_as_completed(record_id)
     
+    def mark_many_done(self, record_ids: List[str]) -> List[DocumentRecord]:
+        """Mark several records as completed and save once."""
+        return self.edit_many(record_ids, status="Completed")
+    
     def save_records(self):
-        """Save records to JSON file."""
+        """Save records to JSON file (deferred by write_delay seconds when enabled)."""
+        if self._bulk_depth > 0:
+            self._bulk_pending.add('records')
+            return
+        if self.write_delay <= 0:
+            self._write_records()
+            return
+        
+        with self._save_lock:
+            self._dirty = True
+            # Restart the timer so a burst of changes results in a single write
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+            self._flush_timer = threading.Timer(self.write_delay, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+    
+    def flush(self):
+        """Write pending changes to disk immediately."""
+        with self._save_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._dirty:
+                self._dirty = False
+                self._write_records()
+    
+    def _write_records(self):
+        """Write records to a temporary file and atomically replace the data file."""
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump([record.to_dict() for record in self.records], f, indent=2, ensure_ascii=False)
+            if self._uses_parquet():
+                with _atomic_open(self.data_file) as f:
+                    self._write_parquet(f)
+            else:
+                # The snapshot, not the live list: this can run on the write-behind timer
+                # thread while records are being added or deleted
+                _write_json_array(self.data_file, (record.to_dict() for record in self.get_all_records()),
+                                  {'schema_version': self.SCHEMA_VERSION}, 'records',
+                                  self.pretty_json)
         except Exception as e:
             print(f"Error saving records: {e}")
     
+    def _uses_parquet(self) -> bool:
+        """Check if the data file is a Parquet file (needs pandas plus pyarrow or fastparquet)."""
+        return self.data_file.endswith('.parquet')
+    
+    def _write_parquet(self, path):
+        """Write the records as one zstd-compressed Parquet table."""
+        if not PANDAS_AVAILABLE:
+            raise RuntimeError("pandas library not available. Install with: pip install pandas pyarrow")
+        self.get_records_frame().to_parquet(path, compression='zstd', index=False)
+    
+    def _read_parquet(self) -> List[DocumentRecord]:
+        """Build records from the Parquet data file."""
+        if not PANDAS_AVAILABLE:
+            raise RuntimeError("pandas library not available. Install with: pip install pandas pyarrow")
+        df = pd.read_parquet(self.data_file)
+        if 'status' not in df.columns:
+            df['status'] = 'Pending'
+        return [DocumentRecord(sender, subject, destination, date, record_id, status=status)
+                for record_id, date, sender, subject, destination, status
+                in zip(*(df[name].tolist() for name in self.RECORD_COLUMNS))]
+    
     def load_records(self):
-        """Load records from JSON file."""
+        """Load records from the data file (JSON, or Parquet for a .parquet data_file)."""
         if not os.path.exists(self.data_file):
             return
         
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            schema_version = self.SCHEMA_VERSION
+            if self._uses_parquet():
+                self.records = self._read_parquet()
+            else:
+                schema_version, data = self._read_records_json()
                 self.records = [DocumentRecord.from_dict(record_data) for record_data in data]
-                # Update existing dates to ISO format
+            # Files written since version 2 already store ISO dates, so only older ones are checked
+            if schema_version < 2:
                 self._update_existing_dates_to_iso()
-                # Set counter to highest existing ID + 1
-                self._initialize_counter_from_records()
+            # Set counter to highest existing ID + 1
+            self._initialize_counter_from_records()
         except Exception as e:
             print(f"Error loading records: {e}")
             self.records = []
     
+    # Above this size records.json is parsed incrementally with ijson when it is installed
+    STREAM_LOAD_THRESHOLD = 50 * 1024 * 1024
+    
+    def _read_records_json(self):
+        """Return (schema_version, iterable of record dicts) from the JSON data file."""
+        if not IJSON_AVAILABLE or os.path.getsize(self.data_file) < self.STREAM_LOAD_THRESHOLD:
+            data = _read_json(self.data_file)
+            if isinstance(data, list):
+                # Version 1 files are a bare list of records
+                return 1, data
+            return data.get('schema_version', 1), data['records']
+        return self._stream_records_json()
+    
+    def _stream_records_json(self):
+        """Like _read_records_json, but yields records one at a time to bound peak memory."""
+        with open(self.data_file, 'rb') as f:
+            first = f.read(64).lstrip()[:1]
+            f.seek(0)
+            if first == b'[':
+                return 1, self._iter_json_items('item')
+            # schema_version is written before the records, so this stops early
+            schema_version = int(next(ijson.items(f, 'schema_version'), 1))
+        return schema_version, self._iter_json_items('records.item')
+    
+    def _iter_json_items(self, prefix, filename: Optional[str] = None):
+        """Yield the JSON values found at prefix in filename (default: the data file)."""
+        with open(filename or self.data_file, 'rb') as f:
+            yield from ijson.items(f, prefix)
+    
     def _initialize_counter_from_records(self):
         """Initialize counter based on existing records to avoid ID conflicts."""
         if not self.records:
             return
         
-        max_counter = 0
-        for record in self.records:
-            # Extract number from ID format "LGU_TNGLN-MAYOR'S OFFICE - 001"
-            try:
-                id_parts = record.id.split(' - ')
-                if len(id_parts) == 2:
-                    number_str = id_parts[1]
-                    number = int(number_str)
-                    max_counter = max(max_counter, number)
-            except (ValueError, IndexError):
-                continue
+        max_counter = max(map(self._id_number, self.records), default=0)
         
         # Set counter to max found + 1, but don't go backwards
-        if DocumentRecord._id_counter is None:
-            DocumentRecord._id_counter = max_counter
-        elif max_counter > DocumentRecord._id_counter:
+        if DocumentRecord._id_counter is None or max_counter > DocumentRecord._id_counter:
             DocumentRecord._id_counter = max_counter
-        
-        # Save the counter if it was updated
-        self._save_counter()
+            # Save the counter only if it was updated
+            self._save_counter()
+    
+    @staticmethod
+    def _id_number(record: DocumentRecord) -> int:
+        """Number at the end of an ID like "MAYOR'S OFFICE - 001" (0 if the ID has another shape)."""
+        head, separator, number = record.id.rpartition(' - ')
+        # Exactly one separator, as in both the current and the old LGU_TNGLN ID format
+        if not separator or ' - ' in head:
+            return 0
+        try:
+            return int(number)
+        except ValueError:
+            return 0
     
     def _update_existing_dates_to_iso(self):
         """Update existing records to use ISO date format."""
@@ -475,6 +980,7 @@ class RecordKeeper:
         
         # Save updated records if any were changed
         if updated_count > 0:
+            self._touch()
             self.save_records()
             print(f"Updated {updated_count} existing date(s) to ISO format.")
     
@@ -484,16 +990,7 @@ class RecordKeeper:
             return False
         
         # Check for readable format patterns
-        readable_patterns = [
-            r'^[A-Za-z]+ \d{1,2}, \d{4}$',  # "January 7, 2025"
-            r'^[A-Za-z]+ \d{1,2}, \d{4} at \d{1,2}:\d{2} [AP]M$',  # "January 7, 2025 at 2:30 PM"
-        ]
-        
-        for pattern in readable_patterns:
-            if re.match(pattern, date_str):
-                return True
-        
-        return False
+        return any(pattern.match(date_str) for pattern in _READABLE_PATTERNS)
     
     def _convert_readable_to_iso(self, date_str: str) -> str:
         """Convert readable date format to ISO format."""
@@ -524,15 +1021,20 @@ class RecordKeeper:
         if not date_str or date_str == "No Date":
             return False
         
-        # Check if it's in MM.DD.YYYY or MM/DD/YYYY format and not already ISO
-        us_format_pattern = r'^\d{1,2}[./]\d{1,2}[./]\d{4}(\s+\d{1,2}:\d{2}:\d{2})?$'
-        iso_pattern = r'^\d{4}-\d{1,2}-\d{1,2}(\s+\d{1,2}:\d{2}:\d{2})?$'
-        
-        # Return True if it matches US format but not ISO format
-        return re.match(us_format_pattern, date_str) and not re.match(iso_pattern, date_str)
+        # Return True if it matches US format (MM.DD.YYYY or MM/DD/YYYY) but not ISO format
+        return _US_FORMAT_PATTERN.match(date_str) and not _ISO_PATTERN.match(date_str)
     
     def get_statistics(self) -> Dict:
-        """Get comprehensive statistics about the records."""
+        """Get comprehensive statistics about the records.
+        
+        Computed once per records_version; each call gets its own copy of the dict.
+        """
+        if self._statistics is None or self._statistics[0] != self.records_version:
+            self._statistics = (self.records_version, self._compute_statistics())
+        return dict(self._statistics[1])
+    
+    def _compute_statistics(self) -> Dict:
+        """Compute get_statistics() from the current records."""
         try:
             if not self.records:
                 return {
@@ -546,12 +1048,26 @@ class RecordKeeper:
                 }
             
             total_records = len(self.records)
-            senders = set(record.sender for record in self.records if record.sender)
-            destinations = set(record.destination for record in self.records if record.destination)
-            
-            # Count status statistics
-            pending_count = sum(1 for record in self.records if record.status == 'Pending')
-            completed_count = sum(1 for record in self.records if record.status == 'Completed')
+            if PANDAS_AVAILABLE:
+                # Column-wise on the cached frame
+                frame = self.get_records_frame()
+                senders = self._distinct_values(frame['sender'])
+                destinations = self._distinct_values(frame['destination'])
+                status_counts = frame['status'].value_counts()
+                pending_count = int(status_counts.get('Pending', 0))
+                completed_count = int(status_counts.get('Completed', 0))
+            else:
+                # Collect everything, then drop the empty values once instead of testing every record
+                senders = {record.sender for record in self.records}
+                destinations = {record.destination for record in self.records}
+                for empty in ('', None):
+                    senders.discard(empty)
+                    destinations.discard(empty)
+                
+                # Count status statistics in one pass
+                status_counts = Counter(record.status for record in self.records)
+                pending_count = status_counts['Pending']
+                completed_count = status_counts['Completed']
             
             return {
                 'total_records': total_records,
@@ -574,32 +1090,40 @@ class RecordKeeper:
                 'destinations': []
             }
     
+    @staticmethod
+    def _distinct_values(column) -> List[str]:
+        """Distinct non-empty values of a frame column."""
+        return column[column.notna() & (column != '')].unique().tolist()
+    
     def export_to_excel(self, filename: str) -> bool:
-        """Export records to Excel file."""
-        if not PANDAS_AVAILABLE:
+        """Export records to Excel file (rustpy-xlsxwriter when available, else pandas/openpyxl)."""
+        if not FAST_EXCEL_AVAILABLE and not PANDAS_AVAILABLE:
             print("Error: pandas library not available. Install with: pip install pandas openpyxl")
             return False
         
         try:
-            # Convert records to list of dictionaries
-            data = [record.to_dict() for record in self.records]
-            
-            if not data:
+            if not self.records:
                 print("No records to export.")
                 return False
             
-            # Create DataFrame
-            df = pd.DataFrame(data)
-            
             # Reorder columns for better readability
             column_order = ['id', 'date', 'sender', 'subject', 'destination']
-            df = df[column_order]
             
             # Export to Excel
             if not filename.endswith('.xlsx'):
                 filename += '.xlsx'
             
-            df.to_excel(filename, index=False, sheet_name='Document Records')
+            if FAST_EXCEL_AVAILABLE:
+                # Rows are streamed from a generator; the writer keeps constant memory
+                rows = ({column: data[column] for column in column_order}
+                        for data in map(DocumentRecord.to_dict, self.records))
+                (FastExcel(filename, autofit=False)
+                    .format(bold_headers=True)
+                    .sheet('Document Records', rows)
+                    .save())
+            else:
+                df = pd.DataFrame([record.to_dict() for record in self.records])
+                df[column_order].to_excel(filename, index=False, sheet_name='Document Records')
             print(f"Records exported successfully to {filename}")
             return True
             
@@ -620,7 +1144,29 @@ class RecordKeeper:
             
             # Read Excel file
             df = pd.read_excel(filename)
-            
+        except Exception as e:
+            print(f"Error importing from Excel: {e}")
+            return False
+        
+        return self.import_from_dataframe(df, replace_existing)
+    
+    def import_from_excel_stream(self, stream, replace_existing: bool = False) -> bool:
+        """Import records from an in-memory Excel file (any binary file-like object)."""
+        if not PANDAS_AVAILABLE:
+            print("Error: pandas library not available. Install with: pip install pandas openpyxl")
+            return False
+        
+        try:
+            df = pd.read_excel(stream)
+        except Exception as e:
+            print(f"Error importing from Excel: {e}")
+            return False
+        
+        return self.import_from_dataframe(df, replace_existing)
+    
+    def import_from_dataframe(self, df, replace_existing: bool = False) -> bool:
+        """Import records from an already parsed DataFrame of an Excel sheet."""
+        try:
             # Normalize column names to lowercase for case-insensitive matching
             original_columns = df.columns.tolist()
             normalized_columns = {col.lower().strip(): col for col in df.columns}
@@ -656,44 +1202,42 @@ class RecordKeeper:
             imported_count = 0
             error_count = 0
             
-            for index, row in df.iterrows():
+            # Parse the whole date column up front instead of once per row
+            date_col = normalized_columns.get('date')
+            dates = self._format_date_column(df[date_col]) if date_col else repeat(None)
+            
+            # Walk plain column arrays rather than boxing every row into a Series
+            senders = df[normalized_columns['sender']].to_numpy()
+            subjects = df[normalized_columns['subject']].to_numpy()
+            destinations = df[destination_col].to_numpy() if destination_col else repeat(None)
+            
+            for index, raw_sender, raw_subject, raw_destination, date in zip(df.index, senders, subjects, destinations, dates):
                 try:
-                    # Extract data from row using normalized column names
-                    sender_col = normalized_columns.get('sender')
-                    subject_col = normalized_columns.get('subject')
-                    date_col = normalized_columns.get('date')
-                    
-                    sender = str(row[sender_col]).strip() if sender_col and pd.notna(row[sender_col]) else ""
-                    subject = str(row[subject_col]).strip() if subject_col and pd.notna(row[subject_col]) else ""
+                    sender = str(raw_sender).strip() if pd.notna(raw_sender) else ""
+                    subject = str(raw_subject).strip() if pd.notna(raw_subject) else ""
                     
                     # Handle destination - use empty string if column doesn't exist or is empty
                     destination = ""
-                    if destination_col and pd.notna(row[destination_col]):
-                        destination = str(row[destination_col]).strip()
+                    if pd.notna(raw_destination):
+                        destination = str(raw_destination).strip()
                     
                     # Skip rows with missing sender or subject (required fields)
                     if not sender or not subject:
                         continue
                     
-                    # Handle date column with parsing and formatting
-                    date = None
-                    if date_col and pd.notna(row[date_col]):
-                        raw_date = str(row[date_col]).strip()
-                        if raw_date:
-                            date = self._parse_and_format_date(raw_date)
-                    
                     # Create and add record - ID is always auto-generated, no auto-date for imports
                     record = DocumentRecord(sender, subject, destination, date, auto_date=False)
                     
                     # Note: ID is always auto-generated and cannot be overridden from Excel
                     
-                    self.records.append(record)
+                    self._append_record(record)
                     imported_count += 1
                     
                 except Exception as e:
                     error_count += 1
                     print(f"Error importing row {index + 1}: {e}")
             
+            self._touch()
             if imported_count > 0:
                 self.save_records()
                 print(f"Successfully imported {imported_count} record(s).")
@@ -710,6 +1254,68 @@ class RecordKeeper:
             print(f"Error importing from Excel: {e}")
             return False
     
+    def _format_date_column(self, column) -> List[Optional[str]]:
+        """Format a whole date column like _parse_and_format_date, with None for empty cells."""
+        if pd.api.types.is_datetime64_any_dtype(column):
+            # Real Excel dates: format in one vectorized pass, dropping midnight times
+            midnight = (column.dt.hour == 0) & (column.dt.minute == 0) & (column.dt.second == 0)
+            formatted = column.dt.strftime('%Y-%m-%d %H:%M:%S').where(~midnight, column.dt.strftime('%Y-%m-%d'))
+            return [None if pd.isna(value) else value for value in formatted]
+        
+        # Text or mixed cells: two rows with the same date text are parsed only once
+        texts = ["" if pd.isna(value) else str(value).strip() for value in column]
+        parsed = self._parse_date_texts(set(texts) - {""})
+        return [parsed[text] if text else None for text in texts]
+    
+    @classmethod
+    def _parse_date_texts(cls, texts) -> Dict[str, Optional[str]]:
+        """Map distinct date strings to _parse_and_format_date results.
+        
+        Plain MM.DD.YYYY / MM/DD/YYYY strings (the usual shape in office sheets) are
+        parsed together by pandas' C strptime; anything else, or anything that fails
+        there, goes through _parse_and_format_date one string at a time.
+        """
+        us_pattern = _DATE_PATTERNS[0][0]
+        candidates = [text for text in texts if us_pattern.match(text)]
+        parsed = {}
+        if candidates:
+            normalized = pd.Series(candidates).str.replace('/', '.', regex=False)
+            dates = pd.to_datetime(normalized, format='%m.%d.%Y', errors='coerce')
+            for text, date in zip(candidates, dates.dt.strftime('%Y-%m-%d')):
+                if not pd.isna(date):
+                    parsed[text] = date
+        
+        for text in texts:
+            if text not in parsed:
+                parsed[text] = cls._parse_and_format_date(text)
+        return parsed
+    
+    def _read_backup(self, filename: str):
+        """Parse a backup file, lazily with simdjson when installed.
+        
+        simdjson returns proxies that only build Python objects for the keys that are
+        read, so the statistics subtree and unused record fields are never materialized.
+        The proxies are only valid until the parser is reused. Backups over
+        STREAM_LOAD_THRESHOLD are streamed with ijson instead.
+        """
+        if IJSON_AVAILABLE and os.path.getsize(filename) >= self.STREAM_LOAD_THRESHOLD:
+            return self._stream_backup(filename)
+        if not SIMDJSON_AVAILABLE:
+            return _read_json(filename)
+        if self._simdjson_parser is None:
+            self._simdjson_parser = simdjson.Parser()
+        with open(filename, 'rb') as f:
+            return self._simdjson_parser.parse(f.read())
+    
+    def _stream_backup(self, filename: str) -> dict:
+        """Like _read_backup, but 'records' is an iterator yielding one record at a time."""
+        with open(filename, 'rb') as f:
+            # backup_info is written first, so this stops early
+            backup_info = next(ijson.items(f, 'backup_info'), None)
+        if backup_info is None:
+            return {}
+        return {'backup_info': backup_info, 'records': self._iter_json_items('records.item', filename)}
+    
     def restore_from_backup(self, filename: str, replace_existing: bool = True) -> bool:
         """Restore records from a JSON backup file."""
         try:
@@ -718,8 +1324,7 @@ class RecordKeeper:
                 return False
             
             # Read backup file
-            with open(filename, 'r', encoding='utf-8') as f:
-                backup_data = json.load(f)
+            backup_data = self._read_backup(filename)
             
             # Validate backup file structure
             if 'backup_info' not in backup_data or 'records' not in backup_data:
@@ -735,52 +1340,46 @@ class RecordKeeper:
             print(f"  Total records: {backup_info.get('total_records', 0)}")
             print(f"  Backup version: {backup_info.get('backup_version', '1.0')}")
             
-            # Backup current records if not replacing
-            if not replace_existing:
-                original_records = self.records.copy()
-            else:
-                self.records = []
-                # Reset ID counter when replacing all records
+            # Restored records are renumbered, from 001 when replacing all records; the
+            # current records and counter stay untouched until the whole batch is built
+            original_counter = DocumentRecord._id_counter
+            if replace_existing:
                 DocumentRecord._id_counter = 0
-                self._save_counter()
-                print("ID counter reset - numbering will start from 001 for new records.")
             
-            restored_count = 0
+            from_backup_dict = DocumentRecord.from_backup_dict
+            restored = []
             error_count = 0
-            
-            for record_data in records_data:
-                try:
-                    # Extract data from backup
-                    sender = record_data.get('sender', '')
-                    subject = record_data.get('subject', '')
-                    destination = record_data.get('destination', '')
-                    date = record_data.get('date')
-                    status = record_data.get('status', 'Pending')
-                    
-                    # Skip records with missing required fields
-                    if not sender or not subject:
-                        continue
-                    
-                    # Create record with original date (no auto-date)
-                    record = DocumentRecord(sender, subject, destination, date, auto_date=False, status=status)
-                    
-                    self.records.append(record)
-                    restored_count += 1
-                    
-                except Exception as e:
-                    error_count += 1
-                    print(f"Error restoring record: {e}")
+            try:
+                for record_data in records_data:
+                    try:
+                        # Skip records with missing required fields
+                        if not record_data.get('sender') or not record_data.get('subject'):
+                            continue
+                        restored.append(from_backup_dict(record_data))
+                    except Exception as e:
+                        error_count += 1
+                        print(f"Error restoring record: {e}")
+            except Exception:
+                DocumentRecord._id_counter = original_counter
+                raise
+            restored_count = len(restored)
             
             if restored_count > 0:
+                if replace_existing:
+                    self.records = restored
+                    print("ID counter reset - numbering will start from 001 for new records.")
+                else:
+                    self.records = self.records + restored
+                # One counter write covers both the reset and the IDs just generated
+                self._save_counter()
                 self.save_records()
                 print(f"Successfully restored {restored_count} record(s) from backup.")
                 if error_count > 0:
                     print(f"Encountered {error_count} error(s) during restore.")
                 return True
             else:
+                DocumentRecord._id_counter = original_counter
                 print("No valid records found in backup to restore.")
-                if not replace_existing:
-                    self.records = original_records
                 return False
                 
         except Exception as e:
@@ -789,7 +1388,7 @@ class RecordKeeper:
     
     def create_excel_template(self, filename: str) -> bool:
         """Create an Excel template file for importing records."""
-        if not PANDAS_AVAILABLE:
+        if not FAST_EXCEL_AVAILABLE and not PANDAS_AVAILABLE:
             print("Error: pandas library not available. Install with: pip install pandas openpyxl")
             return False
         
@@ -802,33 +1401,33 @@ class RecordKeeper:
                 'destination': ['Accounting Department', 'Management Team']
             }
             
-            df = pd.DataFrame(template_data)
+            instructions = {
+                'Instructions': [
+                    '1. Fill in the template with your data',
+                    '2. Required columns: sender, subject, destination',
+                    '3. Optional column: date (YYYY-MM-DD HH:MM:SS format)',
+                    '4. IDs are AUTOMATICALLY generated - do NOT include ID column',
+                    '5. Each record gets format: LGU_TNGLN-MAYOR\'S OFFICE - 001, 002, etc.',
+                    '6. Delete these sample rows before importing',
+                    '7. Save the file before importing',
+                    '8. Use either "destination" or "to" as column header'
+                ]
+            }
             
             if not filename.endswith('.xlsx'):
                 filename += '.xlsx'
             
-            # Create Excel file with formatting
-            with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, sheet_name='Template')
-                
-                # Get the workbook and worksheet
-                workbook = writer.book
-                worksheet = writer.sheets['Template']
-                
-                # Add instructions in a separate sheet
-                instructions = pd.DataFrame({
-                    'Instructions': [
-                        '1. Fill in the template with your data',
-                        '2. Required columns: sender, subject, destination',
-                        '3. Optional column: date (YYYY-MM-DD HH:MM:SS format)',
-                        '4. IDs are AUTOMATICALLY generated - do NOT include ID column',
-                        '5. Each record gets format: LGU_TNGLN-MAYOR\'S OFFICE - 001, 002, etc.',
-                        '6. Delete these sample rows before importing',
-                        '7. Save the file before importing',
-                        '8. Use either "destination" or "to" as column header'
-                    ]
-                })
-                instructions.to_excel(writer, index=False, sheet_name='Instructions')
+            if FAST_EXCEL_AVAILABLE:
+                (FastExcel(filename, autofit=False)
+                    .format(bold_headers=True)
+                    .sheet('Template', [dict(zip(template_data, row)) for row in zip(*template_data.values())])
+                    .sheet('Instructions', [{'Instructions': line} for line in instructions['Instructions']])
+                    .save())
+            else:
+                # Create Excel file, instructions in a separate sheet
+                with pd.ExcelWriter(filename, engine='openpyxl') as writer:
+                    pd.DataFrame(template_data).to_excel(writer, index=False, sheet_name='Template')
+                    pd.DataFrame(instructions).to_excel(writer, index=False, sheet_name='Instructions')
             
             print(f"Excel template created: {filename}")
             print("Fill in your data and use the import function to load records.")
@@ -837,26 +1436,34 @@ class RecordKeeper:
         except Exception as e:
             print(f"Error creating Excel template: {e}")
             return False
-    def update_existing_ids_to_new_format(self) -> bool:
-        """Update existing record IDs from old format to new format."""
+    def plan_id_format_update(self) -> List[Tuple[DocumentRecord, str]]:
+        """Return (record, new_id) for every record still using the old ID format, without changing anything."""
+        # Old format: "LGU_TNGLN-MAYOR'S OFFICE - XXX"; the prefix ends with the
+        # separator, so swapping prefixes keeps the number part as is
+        old_prefix, new_prefix = self.OLD_ID_PREFIX, self.NEW_ID_PREFIX
+        cut = len(old_prefix)
+        # A fixed-length slice compare skips the startswith method call per record
+        return [(record, new_prefix + record.id[cut:])
+                for record in self.records if record.id[:cut] == old_prefix]
+    
+    def update_existing_ids_to_new_format(self, plan: Optional[List[Tuple[DocumentRecord, str]]] = None) -> bool:
+        """Update existing record IDs from old format to new format.
+        
+        Pass the result of plan_id_format_update() to apply an already computed plan.
+        """
         try:
-            updated_count = 0
+            if plan is None:
+                plan = self.plan_id_format_update()
             
-            for record in self.records:
-                # Check if record has old format: "LGU_TNGLN-MAYOR'S OFFICE - XXX"
-                if record.id.startswith("LGU_TNGLN-MAYOR'S OFFICE - "):
-                    # Extract the number part
-                    old_id_parts = record.id.split(" - ")
-                    if len(old_id_parts) >= 2:
-                        number_part = old_id_parts[-1]  # Get the last part (the number)
-                        # Create new ID with simplified format
-                        new_id = f"MAYOR'S OFFICE - {number_part}"
-                        record.id = new_id
-                        updated_count += 1
+            # Apply every new ID in memory, then save once
+            for record, new_id in plan:
+                record.id = new_id
             
-            if updated_count > 0:
+            if plan:
+                self._reindex()
+                self._touch()
                 self.save_records()
-                print(f"Successfully updated {updated_count} existing record ID(s) to new format.")
+                print(f"Successfully updated {len(plan)} existing record ID(s) to new format.")
                 print("Old format: LGU_TNGLN-MAYOR'S OFFICE - XXX")
                 print("New format: MAYOR'S OFFICE - XXX")
                 return True
@@ -885,13 +1492,54 @@ class RecordKeeper:
         except Exception as e:
             print(f"Error resetting data: {e}")
             return False
-            return False
+
+def _print_records(records):
+    """Print records as a numbered list ("1. <record>") with a single write."""
+    if records:
+        sys.stdout.write('\n'.join([f"{i}. {record}" for i, record in enumerate(records, 1)]) + '\n')
+
+MENU_RULE = "=" * 50
+MENU_DIVIDER = "-" * 50
+# Main menu, printed with a single write per loop iteration
+MENU_TEMPLATE = f"""
+{MENU_RULE}
+RECORD KEEPING MANAGEMENT SYSTEM - Logged in as {{username}} ({{role}})
+{MENU_RULE}
+1. Add new record
+2. View all records
+3. Search records
+4. Search by date range
+5. Edit record
+6. Mark record as done
+7. Delete record
+8. View statistics
+9. Export to Excel
+10. Import from Excel (Append)
+11. Import from Excel (Replace)
+12. Create Backup
+13. Create Report
+14. Update existing IDs to new format
+15. Logout
+16. Exit
+{MENU_DIVIDER}"""
+
+# Closing markup of the CLI HTML report; the head holds per-report statistics
+REPORT_HTML_TAIL = """
+            </tbody>
+        </table>
+    </div>
+</body>
+</html>
+"""
 
 def main():
     """Main function to demonstrate the record keeping system with login."""
     
     auth = AuthManager()
     keeper = RecordKeeper()
+    # --pretty: write indented JSON, for debugging
+    if '--pretty' in sys.argv[1:]:
+        auth.pretty_json = keeper.pretty_json = True
 
     while True:
         if not auth.is_logged_in():
@@ -904,26 +1552,8 @@ def main():
                 print("Login failed. Please try again.")
                 continue
         
-        print("\n" + "="*50)
-        print(f"RECORD KEEPING MANAGEMENT SYSTEM - Logged in as {auth.get_current_user().username} ({auth.get_current_user().role})")
-        print("="*50)
-        print("1. Add new record")
-        print("2. View all records")
-        print("3. Search records")
-        print("4. Search by date range")
-        print("5. Edit record")
-        print("6. Mark record as done")
-        print("7. Delete record")
-        print("8. View statistics")
-        print("9. Export to Excel")
-        print("10. Import from Excel (Append)")
-        print("11. Import from Excel (Replace)")
-        print("12. Create Backup")
-        print("13. Create Report")
-        print("14. Update existing IDs to new format")
-        print("15. Logout")
-        print("16. Exit")
-        print("-"*50)
+        current_user = auth.get_current_user()
+        print(MENU_TEMPLATE.format(username=current_user.username, role=current_user.role))
         
         choice = input("Enter your choice (1-16): ").strip()
         
@@ -951,8 +1581,7 @@ def main():
             if not records:
                 print("No records found.")
             else:
-                for i, record in enumerate(records, 1):
-                    print(f"{i}. {record}")
+                _print_records(records)
         
         elif choice == '3':
             print("\n--- Search Records ---")
@@ -963,8 +1592,7 @@ def main():
                     print("No matching records found.")
                 else:
                     print(f"Found {len(records)} matching record(s):")
-                    for i, record in enumerate(records, 1):
-                        print(f"{i}. {record}")
+                    _print_records(records)
         
         elif choice == '4':
             print("\n--- Search by Date Range ---")
@@ -977,8 +1605,7 @@ def main():
                     print("No records found in the specified date range.")
                 else:
                     print(f"Found {len(records)} record(s) in date range:")
-                    for i, record in enumerate(records, 1):
-                        print(f"{i}. {record}")
+                    _print_records(records)
             except Exception as e:
                 print(f"Error searching by date range: {e}")
         
@@ -989,8 +1616,7 @@ def main():
                 print("No records to edit.")
             else:
                 print("Available records:")
-                for i, record in enumerate(records, 1):
-                    print(f"{i}. {record}")
+                _print_records(records)
                 
                 try:
                     record_num = int(input("\nEnter record number to edit: ").strip()) - 1
@@ -1036,14 +1662,15 @@ def main():
                             new_status = record.status
                         
                         # Update the record
-                        if keeper.edit_record(record.id, 
+                        updated_record = keeper.edit_record(record.id, 
                                             date=new_date,
                                             sender=new_sender, 
                                             subject=new_subject, 
                                             destination=new_destination,
-                                            status=new_status):
+                                            status=new_status)
+                        if updated_record:
                             print("\nRecord updated successfully!")
-                            print(f"Updated record: {keeper.get_all_records()[record_num]}")
+                            print(f"Updated record: {updated_record}")
                         else:
                             print("Failed to update record.")
                     else:
@@ -1053,31 +1680,26 @@ def main():
         
         elif choice == '6':
             print("\n--- Mark Record as Done ---")
-            records = keeper.get_all_records()
-            if not records:
+            if not keeper.records:
                 print("No records to mark as done.")
             else:
-                # Show only non-done records
-                pending_records = [r for r in records if r.status != "Done"]
+                # Show only non-done records ("Done" is stored as "Completed"); one pass
+                # over the live list, no snapshot copy
+                pending_records = [r for r in keeper.records if r.status != "Completed"]
                 if not pending_records:
                     print("All records are already marked as done!")
                 else:
                     print("Records that can be marked as done:")
-                    for i, record in enumerate(pending_records, 1):
-                        print(f"{i}. {record}")
+                    _print_records(pending_records)
                     
                     try:
                         record_num = int(input("\nEnter record number to mark as done: ").strip()) - 1
                         if 0 <= record_num < len(pending_records):
                             record = pending_records[record_num]
-                            if keeper.mark_as_done(record.id):
+                            updated_record = keeper.mark_as_done(record.id)
+                            if updated_record:
                                 print(f"\nRecord {record.id} marked as done successfully!")
-                                # Find and show the updated record
-                                updated_records = keeper.get_all_records()
-                                for updated_record in updated_records:
-                                    if updated_record.id == record.id:
-                                        print(f"Updated record: {updated_record}")
-                                        break
+                                print(f"Updated record: {updated_record}")
                             else:
                                 print("Failed to mark record as done.")
                         else:
@@ -1096,8 +1718,7 @@ def main():
                 print("No records to delete.")
             else:
                 print("Available records:")
-                for i, record in enumerate(records, 1):
-                    print(f"{i}. {record}")
+                _print_records(records)
                 
                 try:
                     record_num = int(input("Enter record number to delete: ").strip()) - 1
@@ -1157,7 +1778,7 @@ def main():
                 print("\nAppending records to existing data...")
                 if keeper.import_from_excel(filename, False):  # False means append
                     print("\nImport completed successfully!")
-                    print(f"Total records now: {len(keeper.get_all_records())}")
+                    print(f"Total records now: {len(keeper.records)}")
                 else:
                     print("Import failed.")
             else:
@@ -1179,7 +1800,7 @@ def main():
                     print("\nReplacing all existing records...")
                     if keeper.import_from_excel(filename, True):  # True means replace
                         print("\nImport completed successfully!")
-                        print(f"Total records now: {len(keeper.get_all_records())}")
+                        print(f"Total records now: {len(keeper.records)}")
                     else:
                         print("Import failed.")
                 else:
@@ -1194,27 +1815,33 @@ def main():
                 continue
             
             if keeper.records:
+                # Compact by default: smaller and faster to write and restore
+                human_readable = input("Human-readable (indented, larger) format? (y/N): ").strip().lower() == 'y'
                 print("Creating comprehensive system backup...")
-                backup_time = datetime.now().strftime('%Y%m%d_%H%M%S')
+                # One timestamp for both the filename and created_at
+                now = datetime.now()
+                backup_time = now.strftime('%Y%m%d_%H%M%S')
                 filename = f'backup_{backup_time}.json'
                 
                 try:
-                    # Create comprehensive backup with metadata
-                    backup_data = {
+                    # Create comprehensive backup with metadata; records go last so
+                    # they can be streamed one at a time instead of built into a list
+                    backup_header = {
                         'backup_info': {
-                            'created_at': datetime.now().isoformat(),
+                            'created_at': now.isoformat(),
                             'created_by': auth.get_current_user().username,
                             'total_records': len(keeper.records),
                             'backup_version': '1.0'
                         },
-                        'records': [record.to_dict() for record in keeper.get_all_records()],
                         'statistics': keeper.get_statistics()
                     }
                     
-                    with open(filename, 'w', encoding='utf-8') as f:
-                        json.dump(backup_data, f, indent=2, ensure_ascii=False)
+                    _write_json_array(filename, map(DocumentRecord.to_dict, keeper.iter_records()),
+                                      backup_header, 'records', pretty=human_readable)
                     
                     print(f"System backup created successfully as {filename}.")
+                    if human_readable:
+                        print("Written indented for reading; compact backups are smaller and restore faster.")
                     print(f"Backup contains {len(keeper.records)} records with metadata.")
                 except Exception as e:
                     print(f"Error creating backup: {e}")
@@ -1226,15 +1853,14 @@ def main():
             if keeper.records:
                 print("Generating report...")
                 stats = keeper.get_statistics()
-                report_time = datetime.now().strftime('%Y%m%d_%H%M%S')
+                # One timestamp for both the filename and the "Generated at" line
+                now = datetime.now()
+                report_time = now.strftime('%Y%m%d_%H%M%S')
                 filename = f'report_{report_time}.html'
                 
                 try:
-                    records_html = ""
-                    for record in keeper.get_all_records():
-                        records_html += f"<tr><td>{record.id}</td><td>{record.date}</td><td>{record.sender}</td><td>{record.subject}</td><td>{record.destination}</td></tr>"
-                    
-                    html_content = f"""
+                    # Rows are streamed between the head and REPORT_HTML_TAIL instead of built into one string
+                    html_head = f"""
 <!DOCTYPE html>
 <html lang='en'>
 <head>
@@ -1251,7 +1877,7 @@ def main():
 <body>
     <div class='report-container'>
         <h1>📊 Record Report</h1>
-        <p>Generated by: {auth.get_current_user().username} at {datetime.now().strftime('%B %d, %Y - %I:%M %p')}</p>
+        <p>Generated by: {auth.get_current_user().username} at {now.strftime('%B %d, %Y - %I:%M %p')}</p>
         <p>Total Records: {stats['total_records']}</p>
         <h2>Statistics</h2>
         <ul class='list-group'>
@@ -1262,16 +1888,17 @@ def main():
         <table class='table table-striped'>
             <thead><tr><th>ID</th><th>Date</th><th>Sender</th><th>Subject</th><th>Destination</th></tr></thead>
             <tbody>
-                {records_html}
-            </tbody>
-        </table>
-    </div>
-</body>
-</html>
-"""
+                """
                     
                     with open(filename, 'w', encoding='utf-8') as f:
-                        f.write(html_content)
+                        f.write(html_head)
+                        f.writelines(
+                            f"<tr><td>{escape(str(record.id))}</td><td>{escape(str(record.date))}</td>"
+                            f"<td>{escape(str(record.sender))}</td><td>{escape(str(record.subject))}</td>"
+                            f"<td>{escape(str(record.destination))}</td></tr>"
+                            for record in keeper.iter_records()
+                        )
+                        f.write(REPORT_HTML_TAIL)
                     print(f"Report generated successfully as {filename}.")
                 except Exception as e:
                     print(f"Error generating report: {e}")
@@ -1291,22 +1918,22 @@ def main():
                 print("")
                 
                 # Show records with old format if any exist
-                old_format_records = [r for r in keeper.records if r.id.startswith("LGU_TNGLN-MAYOR'S OFFICE - ")]
-                if old_format_records:
-                    print(f"Found {len(old_format_records)} record(s) with old ID format that will be updated.")
-                    if len(old_format_records) <= 10:  # Show up to 10 records
+                plan = keeper.plan_id_format_update()
+                if plan:
+                    print(f"Found {len(plan)} record(s) with old ID format that will be updated.")
+                    if len(plan) <= 10:  # Show up to 10 records
                         print("Records to be updated:")
-                        for i, record in enumerate(old_format_records[:10], 1):
-                            print(f"  {i}. {record.id} -> MAYOR'S OFFICE - {record.id.split(' - ')[-1]}")
+                        for i, (record, new_id) in enumerate(plan[:10], 1):
+                            print(f"  {i}. {record.id} -> {new_id}")
                     else:
                         print(f"First 10 records to be updated:")
-                        for i, record in enumerate(old_format_records[:10], 1):
-                            print(f"  {i}. {record.id} -> MAYOR'S OFFICE - {record.id.split(' - ')[-1]}")
-                        print(f"  ... and {len(old_format_records) - 10} more records.")
+                        for i, (record, new_id) in enumerate(plan[:10], 1):
+                            print(f"  {i}. {record.id} -> {new_id}")
+                        print(f"  ... and {len(plan) - 10} more records.")
                     
                     confirm = input("\nProceed with updating record IDs? (yes/no): ").strip().lower()
                     if confirm == 'yes':
-                        if keeper.update_existing_ids_to_new_format():
+                        if keeper.update_existing_ids_to_new_format(plan):
                             print("\nID update completed successfully!")
                         else:
                             print("\nID update failed.")
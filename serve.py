@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Production entry point using gevent.
+
+Each connected browser holds an /events stream open indefinitely; under gevent
+those streams are cheap greenlets instead of one blocked thread each.
+
+Usage: python serve.py   (listens on $PORT, default 5000)
+"""
+
+try:
+    from gevent import monkey
+    # Must run before anything imports threading/socket
+    monkey.patch_all()
+    import gevent
+    from gevent.pywsgi import WSGIServer
+    GEVENT_AVAILABLE = True
+except ImportError:
+    GEVENT_AVAILABLE = False
+
+import os
+import signal
+import sys
+
+def main():
+    if not GEVENT_AVAILABLE:
+        print("Error: gevent library not available. Install with: pip install gevent")
+        print("Or run the development server with: python app.py")
+        sys.exit(1)
+
+    from app import app, keeper, _shutdown_streams
+
+    port = int(os.environ.get('PORT', 5000))
+    server = WSGIServer(('0.0.0.0', port), app)
+
+    def stop():
+        # End the open /events streams so stop() doesn't wait them out
+        _shutdown_streams()
+        server.stop()
+
+    # The default SIGTERM kills the process without running atexit, so the records
+    # saved in the last write_delay seconds would be lost; stop and flush instead
+    if sys.platform == 'win32':
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    else:
+        gevent.signal_handler(signal.SIGTERM, stop)
+
+    print(f"Serving on http://0.0.0.0:{port}")
+    try:
+        server.serve_forever()
+    finally:
+        keeper.flush()
+
+if __name__ == "__main__":
+    main()
@@ -8,16 +8,185 @@ import os
 import sys
 import subprocess
 import platform
+import threading
+import importlib.util
+import hashlib
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from importlib.metadata import version, PackageNotFoundError
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from packaging.requirements import Requirement
+    PACKAGING_AVAILABLE = True
+except ImportError:
+    PACKAGING_AVAILABLE = False
+
+# Shortcut creation needs pywin32 (and winshell), which only exist on Windows
+try:
+    import winshell
+    from win32com.client import Dispatch
+    PYWIN32_AVAILABLE = True
+except ImportError:
+    PYWIN32_AVAILABLE = False
+
+# Import name of each requirement, for the import-only check used without packaging
+IMPORT_NAMES = {
+    'python-docx': 'docx',
+    'Pillow': 'PIL',
+    'python-barcode': 'barcode',
+}
+
+# Extra subprocess.run arguments for pip: on Windows, skip the handle cleanup that
+# close_fds does and don't allocate a console window for the child process
+if sys.platform == "win32":
+    PIP_RUN_OPTIONS = {'close_fds': False, 'creationflags': subprocess.CREATE_NO_WINDOW}
+else:
+    PIP_RUN_OPTIONS = {}
+
+# Serializes output from setup steps that run concurrently
+_print_lock = threading.Lock()
+
+def report(message):
+    """Print one status line without interleaving with other running steps"""
+    with _print_lock:
+        print(message)
+
+def requirement_satisfied(package):
+    """Check whether a requirement like 'flask>=2.0.0' is already installed, without running pip"""
+    if PACKAGING_AVAILABLE:
+        requirement = Requirement(package)
+        try:
+            installed = version(requirement.name)
+        except PackageNotFoundError:
+            return False
+        return requirement.specifier.contains(installed, prereleases=True)
+    # Without packaging, only check that the module can be imported
+    name = package.split('>=')[0]
+    return importlib.util.find_spec(IMPORT_NAMES.get(name, name)) is not None
+
+# Launcher batch file written by create_windows_service_files; the window only
+# stays open (pause) when Python exits with an error, so it can be read
+BAT_TEMPLATE = """@echo off
+title {title}
+echo {message}
+cd /d "%~dp0"
+python {script}
+if errorlevel 1 pause"""
+
+def pip_cache_dir():
+    """Persistent pip cache, so re-running setup reuses downloaded wheels"""
+    return Path.cwd() / "cache" / "pip"
+
+def requirements_lock_path():
+    """Hash-pinned lock of the resolved requirements, written by the first setup run"""
+    return Path.cwd() / "cache" / "requirements.lock"
+
+def requirements_key(requirements):
+    """Fingerprint of the requirement list and interpreter a lock was resolved for"""
+    text = "\n".join([sys.version, sys.platform] + list(requirements))
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+def write_requirements_lock(requirements, pip_install, lock_path):
+    """Make sure lock_path pins every package requirements resolve to, by version and hash.
+
+    An existing lock for the same requirements is kept; otherwise pip's dry-run report
+    is turned into a new one. Returns False when no complete lock could be produced."""
+    header = f"# requirements key: {requirements_key(requirements)}"
+    try:
+        with open(lock_path, encoding='utf-8') as f:
+            if f.readline().rstrip("\n") == header:
+                return True
+    except OSError:
+        pass
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        resolution_path = Path(tmp) / "report.json"
+        try:
+            subprocess.run(pip_install + ["--dry-run", "--ignore-installed", "--report", str(resolution_path)]
+                           + list(requirements), check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, **PIP_RUN_OPTIONS)
+        except subprocess.CalledProcessError:
+            # Also the case for pip versions without --dry-run/--report (before 22.2)
+            return False
+        if ORJSON_AVAILABLE:
+            resolution = orjson.loads(resolution_path.read_bytes())
+        else:
+            import json
+            resolution = json.loads(resolution_path.read_text(encoding='utf-8'))
+    
+    lines = [header]
+    for item in resolution.get("install", []):
+        archive = item.get("download_info", {}).get("archive_info", {})
+        # Current pip reports "hashes"; 22.x only a "hash" string like "sha256=..."
+        digest = archive.get("hashes", {}).get("sha256")
+        if digest is None and archive.get("hash", "").startswith("sha256="):
+            digest = archive["hash"][len("sha256="):]
+        if digest is None:
+            # Local or VCS sources have no archive hash to pin
+            return False
+        metadata = item["metadata"]
+        lines.append(f"{metadata['name']}=={metadata['version']} --hash=sha256:{digest}")
+    
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    lock_path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+    return True
+
+def canonical_name(name):
+    """Normalized distribution name (PEP 503), so 'Flask' and 'flask' compare equal"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+def lock_entries_to_install(lock_path, missing):
+    """Lock lines still to install, or None when the lock doesn't fit this environment.
+
+    Pins for packages that aren't installed are kept and those already installed at the
+    pinned version dropped. Applying the lock may only change an installed version for
+    one of the missing requirements themselves. If another installed package is at a
+    different version, the lock would downgrade or upgrade it, so None is returned
+    and pip resolves against the environment instead.
+    """
+    missing_names = {canonical_name(re.split(r"[<>=!~; \[]", package, 1)[0]) for package in missing}
+    entries = []
+    with open(lock_path, encoding='utf-8') as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            name, pinned = line.split(" ", 1)[0].split("==", 1)
+            try:
+                installed = version(name)
+            except PackageNotFoundError:
+                entries.append(line)
+                continue
+            if installed == pinned:
+                continue
+            if canonical_name(name) not in missing_names:
+                return None
+            entries.append(line)
+    return entries
+
+@lru_cache(maxsize=1)
+def platform_info():
+    """System, release, architecture and Python version, looked up once per run"""
+    return (platform.system(), platform.release(), platform.architecture()[0],
+            platform.python_version())
+
 def check_python_version():
     """Check if Python version is compatible"""
     version = sys.version_info
+    python_version = platform_info()[3]
     if version.major < 3 or (version.major == 3 and version.minor < 8):
         print("❌ Python 3.8 or higher required for Windows 10 compatibility")
-        print(f"Current version: {platform.python_version()}")
+        print(f"Current version: {python_version}")
         return False
-    print(f"✅ Python {platform.python_version()} - Compatible")
+    print(f"✅ Python {python_version} - Compatible")
     return True
 
 def install_requirements():
@@ -38,10 +207,57 @@ def install_requirements():
     ]
     
     print("📦 Installing required packages for Windows 10...")
+    # Only the unsatisfied requirements go to pip; no subprocess at all when none are
+    all_requirements = requirements
+    missing = [package for package in requirements if not requirement_satisfied(package)]
+    if not missing:
+        print("✅ All requirements already satisfied")
+        return True
+    for package in requirements:
+        if package not in missing:
+            print(f"✅ {package.split('>=')[0]} (already installed)")
+    requirements = missing
+    
+    cache_dir = pip_cache_dir()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    pip_install = [sys.executable, "-m", "pip", "install", "--disable-pip-version-check", "--no-input",
+                   "--prefer-binary", "--cache-dir", str(cache_dir)]
+    
+    # With a lock for these requirements, pip installs the pinned files as listed and
+    # skips dependency resolution; the lock is resolved once, on the first run. Only
+    # the pins not yet installed are applied, so installed packages keep their versions
+    lock_path = requirements_lock_path()
+    if write_requirements_lock(all_requirements, pip_install, lock_path):
+        entries = lock_entries_to_install(lock_path, requirements)
+        if entries:
+            subset_path = lock_path.with_name("requirements.pending.lock")
+            subset_path.write_text("".join(entries), encoding='utf-8')
+            try:
+                subprocess.run(pip_install + ["--no-deps", "--require-hashes", "-r", str(subset_path)], check=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, **PIP_RUN_OPTIONS)
+                for package in requirements:
+                    print(f"✅ {package.split('>=')[0]}")
+                return True
+            except subprocess.CalledProcessError:
+                pass
+            finally:
+                subset_path.unlink()
+    
+    # One pip run resolves and installs everything, instead of one process per package
+    try:
+        subprocess.run(pip_install + requirements, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, **PIP_RUN_OPTIONS)
+        for package in requirements:
+            print(f"✅ {package.split('>=')[0]}")
+        return True
+    except subprocess.CalledProcessError:
+        pass
+    
+    # The batch failed; retry one package at a time to report which one
     for package in requirements:
         try:
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package], 
-                                stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+            subprocess.run(pip_install + [package], check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT, **PIP_RUN_OPTIONS)
             print(f"✅ {package.split('>=')[0]}")
         except subprocess.CalledProcessError:
             print(f"❌ Failed to install {package}")
@@ -59,86 +275,82 @@ def create_windows_directories():
         "documents",
         "backups",
         "logs",
-        "config"
+        "config",
+        "cache"
     ]
     
     print("📁 Creating directory structure...")
-    for directory in directories:
-        dir_path = base_dir / directory
-        dir_path.mkdir(exist_ok=True)
-        print(f"✅ {directory}/")
+    # One listing of base_dir finds the directories left by an earlier setup, so
+    # only the missing ones cost a mkdir call
+    with os.scandir(base_dir) as entries:
+        present = {entry.name for entry in entries if entry.is_dir()}
+    missing = [directory for directory in directories if directory not in present]
+    # Parents before children, so nested entries never need a parent created on the way
+    for directory in sorted(missing, key=lambda name: len(Path(name).parts)):
+        os.makedirs(base_dir / directory, exist_ok=True)
+    # One write for the whole listing instead of a print per directory
+    sys.stdout.write("".join(f"✅ {directory}/\n" for directory in directories))
     
     return True
 
 def create_windows_service_files():
     """Create Windows service and batch files"""
     
-    # Create batch file to start the application
-    start_bat = """@echo off
-title Record Keeping System
-echo Starting Record Keeping System...
-cd /d "%~dp0"
-python app.py
-pause"""
-    
-    with open("start_app.bat", "w") as f:
-        f.write(start_bat)
+    # Batch file to start the application, and one for the CLI
+    Path("start_app.bat").write_text(BAT_TEMPLATE.format(
+        title="Record Keeping System", message="Starting Record Keeping System...", script="app.py"))
+    Path("start_cli.bat").write_text(BAT_TEMPLATE.format(
+        title="Record Keeping System - CLI", message="Record Keeping System - Command Line Interface",
+        script="record_keeper.py"))
     
-    # Create batch file for CLI
-    cli_bat = """@echo off
-title Record Keeping System - CLI
-echo Record Keeping System - Command Line Interface
-cd /d "%~dp0"
-python record_keeper.py
-pause"""
-    
-    with open("start_cli.bat", "w") as f:
-        f.write(cli_bat)
-    
-    print("✅ Windows batch files created")
+    report("✅ Windows batch files created")
     return True
 
+@lru_cache(maxsize=1)
+def wscript_shell():
+    """The WScript.Shell COM object, created (and COM initialized) on first use only"""
+    return Dispatch('WScript.Shell')
+
 def create_desktop_shortcut():
     """Create desktop shortcut (Windows 10)"""
-    try:
-        import winshell
-        from win32com.client import Dispatch
-        
-        desktop = winshell.desktop()
-        path = os.path.join(desktop, "Record Keeping System.lnk")
-        target = os.path.join(os.getcwd(), "start_app.bat")
-        wDir = os.getcwd()
-        icon = os.path.join(os.getcwd(), "start_app.bat")
-        
-        shell = Dispatch('WScript.Shell')
-        shortcut = shell.CreateShortCut(path)
-        shortcut.Targetpath = target
-        shortcut.WorkingDirectory = wDir
-        shortcut.IconLocation = icon
-        shortcut.save()
-        
-        print("✅ Desktop shortcut created")
-        return True
-    except ImportError:
+    if not PYWIN32_AVAILABLE:
         print("ℹ️  Desktop shortcut creation requires pywin32 package")
         return False
+    
+    desktop = winshell.desktop()
+    path = os.path.join(desktop, "Record Keeping System.lnk")
+    target = os.path.join(os.getcwd(), "start_app.bat")
+    wDir = os.getcwd()
+    icon = os.path.join(os.getcwd(), "start_app.bat")
+    
+    shortcut = wscript_shell().CreateShortCut(path)
+    shortcut.Targetpath = target
+    shortcut.WorkingDirectory = wDir
+    shortcut.IconLocation = icon
+    shortcut.save()
+    
+    print("✅ Desktop shortcut created")
+    return True
 
 def optimize_for_windows():
     """Apply Windows 10 specific optimizations"""
     
     # Set Windows-friendly paths
     os.environ['PYTHONIOENCODING'] = 'utf-8'
+    # Later pip runs from this process share the setup's wheel cache
+    os.environ['PIP_CACHE_DIR'] = str(pip_cache_dir())
     
     # Create Windows registry entry (optional)
-    print("⚙️  Applying Windows 10 optimizations...")
+    report("⚙️  Applying Windows 10 optimizations...")
     
-    # Configure matplotlib for Windows (if using charts)
-    try:
-        import matplotlib
-        matplotlib.use('Agg')  # Use non-interactive backend
-        print("✅ Matplotlib configured for Windows")
-    except ImportError:
-        pass
+    # Configure matplotlib for Windows (if using charts): the non-interactive backend,
+    # picked up on matplotlib's first import instead of importing it here
+    if importlib.util.find_spec('matplotlib') is not None:
+        backend = os.environ.setdefault('MPLBACKEND', 'Agg')
+        if backend.lower() == 'agg':
+            report("✅ Matplotlib configured for Windows")
+        else:
+            report(f"⚠️  Matplotlib not configured: MPLBACKEND is already set to '{backend}'")
     
     return True
 
@@ -172,11 +384,15 @@ def create_config_file():
         }
     }
     
-    import json
-    with open("config/app_config.json", "w") as f:
-        json.dump(config, f, indent=2)
+    config_path = Path("config") / "app_config.json"
+    if ORJSON_AVAILABLE:
+        config_path.write_bytes(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+    else:
+        import json
+        with open(config_path, "w") as f:
+            json.dump(config, f, indent=2)
     
-    print("✅ Configuration file created")
+    report("✅ Configuration file created")
     return True
 
 def main():
@@ -188,13 +404,17 @@ def main():
     if not check_python_version():
         return False
     
-    print(f"💻 Operating System: {platform.system()} {platform.release()}")
-    print(f"🖥️  Architecture: {platform.architecture()[0]}")
+    system, release, architecture, _ = platform_info()
+    print(f"💻 Operating System: {system} {release}")
+    print(f"🖥️  Architecture: {architecture}")
     
-    # Run setup steps
+    # Run setup steps; packages first, and directories before the files written into them
     steps = [
         ("Installing packages", install_requirements),
         ("Creating directories", create_windows_directories),
+    ]
+    # These touch disjoint files, so they run concurrently
+    parallel_steps = [
         ("Creating batch files", create_windows_service_files),
         ("Creating configuration", create_config_file),
         ("Applying optimizations", optimize_for_windows),
@@ -206,6 +426,14 @@ def main():
             print(f"❌ Failed: {step_name}")
             return False
     
+    print(f"\n📋 {', '.join(step_name for step_name, _ in parallel_steps)}...")
+    with ThreadPoolExecutor(max_workers=len(parallel_steps)) as pool:
+        futures = [(step_name, pool.submit(step_func)) for step_name, step_func in parallel_steps]
+        failed = [step_name for step_name, future in futures if not future.result()]
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}")
+        return False
+    
     print("\n🎉 Setup completed successfully!")
     print("\n📋 Next steps:")
     print("1. Double-click 'start_app.bat' to run the web interface")
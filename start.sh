@@ -8,4 +8,5 @@ mkdir -p uploads/logos
 export FLASK_ENV=production
 
 # Start the application
-exec gunicorn --bind 0.0.0.0:$PORT --workers 1 --timeout 0 app:app
+# gevent workers let one process hold many open /events streams
+exec gunicorn --bind 0.0.0.0:$PORT --workers 1 --worker-class gevent --worker-connections 1000 --timeout 0 app:app
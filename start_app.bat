@@ -3,4 +3,4 @@ title Record Keeping System
 echo Starting Record Keeping System...
 cd /d "%~dp0"
 python app.py
-pause
\ No newline at end of file
+if errorlevel 1 pause
\ No newline at end of file
@@ -3,4 +3,4 @@ title Record Keeping System - CLI
 echo Record Keeping System - Command Line Interface
 cd /d "%~dp0"
 python record_keeper.py
-pause
\ No newline at end of file
+if errorlevel 1 pause
\ No newline at end of file
@@ -0,0 +1,57 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from record_keeper import RecordKeeper, _atomic_open
+
+THREADS = 4
+WRITES_PER_THREAD = 50
+
+
+def _run_concurrently(target):
+    """Run target in THREADS threads at once and return the exceptions they raised."""
+    errors = []
+    barrier = threading.Barrier(THREADS)
+
+    def worker():
+        barrier.wait()
+        try:
+            target()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def test_concurrent_atomic_writes_to_one_path(tmp_path):
+    path = tmp_path / "counter.txt"
+
+    def write_many():
+        for i in range(WRITES_PER_THREAD):
+            with _atomic_open(path, 'w') as f:
+                f.write(str(i))
+
+    assert _run_concurrently(write_many) == []
+    assert path.read_text() == str(WRITES_PER_THREAD - 1)
+    # No temporary files are left behind
+    assert os.listdir(tmp_path) == ["counter.txt"]
+
+
+def test_concurrent_add_record(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    keeper = RecordKeeper(str(tmp_path / "records.json"))
+
+    def add_many():
+        for i in range(WRITES_PER_THREAD):
+            keeper.add_record("sender", f"subject {i}", "destination")
+
+    assert _run_concurrently(add_many) == []
+    assert len(keeper.records) == THREADS * WRITES_PER_THREAD
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
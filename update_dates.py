@@ -1,21 +1,167 @@
-from record_keeper import RecordKeeper
+import hashlib
+import os
+import re
+import sys
+from calendar import isleap
 
-# Initialize the RecordKeeper
-def update_dates():
-    keeper = RecordKeeper()
-    records = keeper.get_all_records()
-    updated = False
+from record_keeper import (RecordKeeper, DocumentRecord, PANDAS_AVAILABLE, IJSON_AVAILABLE,
+                           _read_json, _write_json, _write_json_array)
 
-    # Update records with MM.DD.YYYY or MM/DD/YYYY format
-    for record in records:
-        if record.date and ('.' in record.date or '/' in record.date):
-            parsed_date = keeper._parse_and_format_date(record.date)
+if IJSON_AVAILABLE:
+    import ijson
+
+# The common shapes, MM.DD.YYYY and MM/DD/YYYY, are converted without strptime or datetime
+DATE_RE = re.compile(r"^([0-9]{1,2})[./]([0-9]{1,2})[./]([0-9]{4})$")
+DAYS_IN_MONTH = (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def parse_us_date(text):
+    """Return 'YYYY-MM-DD' for a valid MM.DD.YYYY or MM/DD/YYYY date, else None."""
+    match = DATE_RE.match(text)
+    if match is None:
+        return None
+    month, day, year = map(int, match.groups())
+    # Years below 1000 are left to strftime, whose padding of them differs by platform
+    if year < 1000 or not 1 <= month <= 12 or not 1 <= day <= DAYS_IN_MONTH[month - 1]:
+        return None
+    if month == 2 and day == 29 and not isleap(year):
+        return None
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+# Where the hash of the last data file this script normalized is kept
+CONFIG_FILE = os.path.join("config", "app_config.json")
+STAMP_KEY = "last_date_normalize"
+
+def file_hash(path):
+    """blake2b of a file's contents, read in chunks"""
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_config():
+    """The app config, or an empty one when it is missing or unreadable"""
+    try:
+        config = _read_json(CONFIG_FILE)
+    except (OSError, ValueError):
+        return {}
+    return config if isinstance(config, dict) else {}
+
+def already_normalized(data_file):
+    """Check whether data_file is unchanged since update_dates last finished with it"""
+    stamp = read_config().get(STAMP_KEY)
+    if not isinstance(stamp, dict) or stamp.get('file') != os.path.abspath(data_file):
+        return False
+    try:
+        return stamp.get('hash') == file_hash(data_file)
+    except OSError:
+        return False
+
+def stamp_normalized(data_file):
+    """Record data_file's current hash, so an unchanged file is skipped next run"""
+    if not os.path.exists(data_file):
+        return
+    config = read_config()
+    config[STAMP_KEY] = {'file': os.path.abspath(data_file), 'hash': file_hash(data_file)}
+    try:
+        os.makedirs(os.path.dirname(CONFIG_FILE), exist_ok=True)
+        _write_json(CONFIG_FILE, config, pretty=True)
+    except OSError as e:
+        print(f"Error saving normalization stamp: {e}")
+
+def needs_parsing(date):
+    """Only MM.DD.YYYY or MM/DD/YYYY style dates need parsing"""
+    return bool(date) and ('.' in date or '/' in date)
+
+def parse_dates(texts):
+    """Map each distinct date string to its ISO form (None when it can't be parsed)"""
+    # The fixed-shape parser first, then the general parser (as one pandas batch
+    # when available) for whatever it didn't handle
+    parsed = {text: parse_us_date(text) for text in texts}
+    rest = {text for text, result in parsed.items() if result is None}
+    if PANDAS_AVAILABLE:
+        parsed.update(RecordKeeper._parse_date_texts(rest))
+    else:
+        parsed.update((text, RecordKeeper._parse_and_format_date(text)) for text in rest)
+    return parsed
+
+def streamable(data_file):
+    """Check whether data_file is a large current-schema JSON file to stream instead of load"""
+    if not IJSON_AVAILABLE or data_file.endswith('.parquet') or not os.path.exists(data_file):
+        return False
+    if os.path.getsize(data_file) < RecordKeeper.STREAM_LOAD_THRESHOLD:
+        return False
+    with open(data_file, 'rb') as f:
+        if f.read(64).lstrip()[:1] != b'{':
+            return False
+        f.seek(0)
+        # Older schemas have dates converted on load, so they take the RecordKeeper path
+        return int(next(ijson.items(f, 'schema_version'), 1)) >= 2
+
+def iter_data_file(data_file):
+    """Yield the records of data_file one at a time, as RecordKeeper would load them"""
+    with open(data_file, 'rb') as f:
+        for record_data in ijson.items(f, 'records.item'):
+            yield DocumentRecord.from_dict(record_data)
+
+def stream_update_dates(data_file):
+    """update_dates for a large data file, holding one record in memory at a time.
+
+    A first pass collects the distinct dates to parse; only if one changes does a
+    second pass rewrite the file, through the atomic writer save_records uses.
+    """
+    parsed = parse_dates({record.date for record in iter_data_file(data_file)
+                          if needs_parsing(record.date)})
+    if not any(result and result != text for text, result in parsed.items()):
+        print("No records requiring date updates.")
+        return
+    
+    def updated_records():
+        for record in iter_data_file(data_file):
+            parsed_date = parsed.get(record.date)
             if parsed_date and parsed_date != record.date:
-                print(f"Updating date from {record.date} to {parsed_date}")  # Debug
+                sys.stdout.write(f"Updating date from {record.date} to {parsed_date}\n")  # Debug
                 record.date = parsed_date
-                updated = True
+            yield record.to_dict()
+    
+    _write_json_array(data_file, updated_records(),
+                      {'schema_version': RecordKeeper.SCHEMA_VERSION}, 'records')
+    print("Records updated successfully.")
+
+def update_dates(data_file="records.json"):
+    # Re-running on a file this script already normalized would find nothing to change
+    if already_normalized(data_file):
+        print("No records requiring date updates.")
+        return
+    
+    if streamable(data_file):
+        stream_update_dates(data_file)
+    else:
+        update_loaded_dates(data_file)
+    stamp_normalized(data_file)
+
+def update_loaded_dates(data_file):
+    """update_dates through a RecordKeeper holding all records in memory"""
+    keeper = RecordKeeper(data_file)
+    records = keeper.get_all_records()
+    # Messages for the changed records, written in one go after the loop
+    messages = []
+
+    # Only records with MM.DD.YYYY or MM/DD/YYYY style dates need parsing
+    candidates = [record for record in records if needs_parsing(record.date)]
+
+    # Parse each distinct date once
+    parsed = parse_dates({record.date for record in candidates})
+
+    # Update records with MM.DD.YYYY or MM/DD/YYYY format
+    for record in candidates:
+        parsed_date = parsed[record.date]
+        if parsed_date and parsed_date != record.date:
+            messages.append(f"Updating date from {record.date} to {parsed_date}\n")  # Debug
+            record.date = parsed_date
 
-    if updated:
+    if messages:
+        sys.stdout.write("".join(messages))
         keeper.save_records()
         print("Records updated successfully.")
     else: